@@ -1,11 +1,38 @@
 """Dependency injection for FastAPI routes."""
 
+import hashlib
+from typing import Any
+
+from fastapi import HTTPException, Request, Response, status
 from sqlmodel import Session as SQLModelSession
 
 from src.db import engine
 
 
 def get_db():
-    """Database session dependency for FastAPI routes."""
+    """Database session dependency for FastAPI routes.
+
+    Sessions are cheap; the underlying DBAPI connection is checked out of the
+    engine's pool (see ``src.db``) rather than opened per request.
+    """
     with SQLModelSession(engine) as session:
         yield session
+
+
+def etag_or_304(request: Request, response: Response, *parts: Any) -> None:
+    """
+    Tag a response with an ETag derived from ``parts`` and short-circuit with
+    304 Not Modified when the client already holds that version.
+
+    ``parts`` must identify everything the response depends on; their
+    ``repr`` is hashed, so use plain values (ids, tuples, strings, numbers).
+
+    The tag is weak (``W/``): it names the content, while GZipMiddleware may
+    send it in either gzip or identity encoding, which are not byte-identical.
+    """
+    opaque_tag = f'"{hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()}"'
+    etag = f"W/{opaque_tag}"
+    if_none_match = request.headers.get("if-none-match", "")
+    if opaque_tag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
@@ -1,22 +1,39 @@
 """FastAPI main application for BareTrack."""
 
+import atexit
 import logging
+import queue
 import time
 from contextlib import asynccontextmanager
+from functools import cache
+from logging.handlers import QueueHandler, QueueListener
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
+from starlette.middleware import Middleware
+from starlette.routing import Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from api.routers import analysis, analytics, arrows, bows, crawls, rounds, scoring, sessions, tabs
 from src.db import create_db_and_tables
 
 logger = logging.getLogger("baretrack")
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s  %(levelname)-8s  %(name)s  %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
+
+# Records are handed to a queue and formatted/written to stderr on a listener
+# thread, so request handlers never block on the stream handler's lock or I/O.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(
+    logging.Formatter("%(asctime)s  %(levelname)-8s  %(name)s  %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
 )
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))  # layout is applied once, on the listener
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+_log_listener = QueueListener(_log_queue, _stream_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 
 @asynccontextmanager
@@ -29,35 +46,66 @@ async def lifespan(app: FastAPI):
     logger.info("BareTrack API shutting down")
 
 
+class RequestTimingLogger:
+    """Log every request with timing.
+
+    Implemented as plain ASGI middleware rather than ``@app.middleware("http")`` so
+    requests don't pay for Starlette's ``BaseHTTPMiddleware`` request/response
+    wrapping and extra task.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if logger.isEnabledFor(logging.INFO):
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                logger.info("%s %s → %s (%.0fms)", scope["method"], scope["path"], status_code, elapsed_ms)
+
+
+# Middleware is declared up front (outermost first) so the stack is built once
+middleware = [
+    Middleware(RequestTimingLogger),
+    Middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:5173",  # Vite default
+            "http://localhost:3000",  # Create React App default
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["ETag"],
+    ),
+    # Analytics payloads (trend series, shot lists) are long runs of similar
+    # numbers and compress well; small responses aren't worth the CPU.
+    Middleware(GZipMiddleware, minimum_size=1024),
+]
+
 app = FastAPI(
     title="BareTrack API",
     description="REST API for BareTrack archery management system",
     version="1.0.2",
     lifespan=lifespan,
+    middleware=middleware,
 )
 
-# CORS Configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:5173",  # Vite default
-        "http://localhost:3000",  # Create React App default
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log every request with timing."""
-    start = time.perf_counter()
-    response = await call_next(request)
-    elapsed_ms = (time.perf_counter() - start) * 1000
-    logger.info("%s %s → %s (%.0fms)", request.method, request.url.path, response.status_code, elapsed_ms)
-    return response
-
 
 @app.exception_handler(Exception)
 async def unhandled_exception_handler(request: Request, exc: Exception):
@@ -67,19 +115,46 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
 
 
 # Mount routers
-app.include_router(bows.router, prefix="/api/bows", tags=["Bow Setups"])
-app.include_router(arrows.router, prefix="/api/arrows", tags=["Arrow Setups"])
-app.include_router(tabs.router, prefix="/api/tabs", tags=["Tab Setups"])
-app.include_router(sessions.router, prefix="/api/sessions", tags=["Sessions"])
-app.include_router(scoring.router, prefix="/api/scoring", tags=["Scoring"])
-app.include_router(analysis.router, prefix="/api/analysis", tags=["Analysis"])
-app.include_router(crawls.router, prefix="/api/crawls", tags=["Crawl Regression"])
-app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
-app.include_router(rounds.router, prefix="/api/rounds", tags=["Rounds"])
-
-
-@app.get("/api/health")
-@app.get("/")
-def root():
+ROUTERS = (
+    (bows.router, "/api/bows", "Bow Setups"),
+    (arrows.router, "/api/arrows", "Arrow Setups"),
+    (tabs.router, "/api/tabs", "Tab Setups"),
+    (sessions.router, "/api/sessions", "Sessions"),
+    (scoring.router, "/api/scoring", "Scoring"),
+    (analysis.router, "/api/analysis", "Analysis"),
+    (crawls.router, "/api/crawls", "Crawl Regression"),
+    (analytics.router, "/api/analytics", "Analytics"),
+    (rounds.router, "/api/rounds", "Rounds"),
+)
+for router, prefix, tag in ROUTERS:
+    app.include_router(router, prefix=prefix, tags=[tag])
+
+
+# Health checks are probed constantly, so they are plain Starlette routes that
+# return one pre-built response, skipping FastAPI's dependency and
+# serialisation layers. Listed first so they match before any router.
+_HEALTH_RESPONSE = JSONResponse({"status": "ok", "service": "BareTrack API"})
+
+
+async def root(request: Request) -> Response:
     """Health check endpoint."""
-    return {"status": "ok", "service": "BareTrack API"}
+    return _HEALTH_RESPONSE
+
+
+app.router.routes[:0] = [Route("/api/health", root), Route("/", root)]
+
+
+# Serve the OpenAPI document from bytes rendered once, instead of FastAPI's
+# default route re-serialising the cached schema dict on every /docs load.
+app.router.routes[:] = [r for r in app.router.routes if getattr(r, "path", None) != app.openapi_url]
+
+
+@cache
+def _openapi_bytes() -> bytes:
+    return JSONResponse(app.openapi()).body
+
+
+@app.get(app.openapi_url, include_in_schema=False)
+def openapi() -> Response:
+    """OpenAPI schema for the API, rendered once per process."""
+    return Response(_openapi_bytes(), media_type="application/json")
@@ -1,23 +1,31 @@
 """Physics and analysis endpoints."""
 
+from functools import lru_cache
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import true
 from sqlmodel import Session as SQLModelSession
+from sqlmodel import select
 
-from api.deps import get_db
+from api.deps import etag_or_304, get_db
 from src.analysis import VirtualCoach
 from src.models import ArrowSetup, BowSetup
-from src.park_model import predict_score_at_distance
+from src.park_model import predict_score_at_distance, predict_score_batch
 from src.physics import analyze_setup_safety, score_setup_efficiency
 
 router = APIRouter()
 
+# Upper bound on targets per batch prediction; a what-if sweep needs far fewer
+MAX_BATCH_TARGETS = 1000
+
 
 class VirtualCoachRequest(BaseModel):
     """Request schema for virtual coach analysis."""
 
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     bow_id: str
     arrow_id: str
     short_score: float
@@ -31,6 +39,8 @@ class VirtualCoachRequest(BaseModel):
 class PredictScoreRequest(BaseModel):
     """Request schema for score prediction."""
 
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     known_score: float
     known_distance_m: float
     known_face_cm: int
@@ -38,9 +48,37 @@ class PredictScoreRequest(BaseModel):
     target_face_cm: int
 
 
+class PredictScoreResponse(BaseModel):
+    """Response schema for score prediction."""
+
+    predicted_score: float
+    predicted_sigma: float
+
+
+class PredictScoreBatchRequest(BaseModel):
+    """Request schema for projecting one known score onto many target distances/faces."""
+
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
+    known_score: float
+    known_distance_m: float
+    known_face_cm: int
+    target_distances_m: list[float] = Field(max_length=MAX_BATCH_TARGETS)
+    target_faces_cm: list[int] = Field(max_length=MAX_BATCH_TARGETS)
+
+
+class PredictScoreBatchResponse(BaseModel):
+    """Response schema for batched score prediction (same order as the request targets)."""
+
+    predicted_scores: list[float]
+    predicted_sigmas: list[float]
+
+
 class SetupEfficiencyRequest(BaseModel):
     """Request schema for setup efficiency scoring."""
 
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     bow_id: str
     arrow_id: str
     discipline: str = "indoor"  # indoor or outdoor
@@ -49,11 +87,96 @@ class SetupEfficiencyRequest(BaseModel):
 class SafetyCheckRequest(BaseModel):
     """Request schema for safety check."""
 
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     bow_id: str
     arrow_id: str
 
 
-@router.post("/virtual-coach")
+class SetupEfficiencyResponse(BaseModel):
+    """Response schema for setup efficiency scoring."""
+
+    score: int
+    gpp: float
+    feedback: list[str]
+
+
+class SafetyCheckResponse(BaseModel):
+    """Response schema for safety check."""
+
+    warnings: list[str]
+
+
+class PerformanceMetrics(BaseModel):
+    """Park Model drag-loss metrics within a virtual coach result."""
+
+    predicted_score: float
+    actual_score: float
+    points_lost: float
+    percent_loss: float
+
+
+class VirtualCoachResponse(BaseModel):
+    """Response schema for virtual coach analysis."""
+
+    safety: list[str]
+    setup_score: SetupEfficiencyResponse
+    performance_metrics: PerformanceMetrics
+    coach_recommendations: list[str]
+
+
+def _fetch_bow_and_arrow(db: SQLModelSession, bow_id: str, arrow_id: str) -> tuple[BowSetup, ArrowSetup]:
+    """Load a bow and arrow setup in a single round trip, raising 404 if either is missing."""
+    statement = (
+        select(BowSetup, ArrowSetup)
+        .join(ArrowSetup, true())  # explicit cross join of two single-row lookups
+        .where(BowSetup.id == bow_id, ArrowSetup.id == arrow_id)
+    )
+    row = db.exec(statement).first()
+    if row:
+        return row
+
+    # Miss path only: work out which one is absent for the error message
+    if not db.get(BowSetup, bow_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bow setup not found")
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Arrow setup not found")
+
+
+def _row_key(row: BowSetup | ArrowSetup) -> tuple:
+    """Hashable snapshot of an equipment row's column values."""
+    return tuple(row.model_dump().items())
+
+
+@lru_cache(maxsize=512)
+def _cached_coach_analysis(
+    bow_key: tuple,
+    arrow_key: tuple,
+    short_score: float,
+    short_dist: float,
+    short_face: int,
+    long_score: float,
+    long_dist: float,
+    long_face: int,
+) -> dict[str, Any]:
+    """
+    Memoised VirtualCoach run.
+
+    Keyed on the full bow/arrow column values rather than their IDs, so editing
+    either setup naturally produces a new key. The returned dict is shared
+    between callers and must be treated as read-only.
+    """
+    coach = VirtualCoach(BowSetup(**dict(bow_key)), ArrowSetup(**dict(arrow_key)))
+    return coach.analyze_session_performance(
+        short_score=short_score,
+        short_dist=short_dist,
+        short_face=short_face,
+        long_score=long_score,
+        long_dist=long_dist,
+        long_face=long_face,
+    )
+
+
+@router.post("/virtual-coach", response_model=VirtualCoachResponse)
 def analyze_performance(request: VirtualCoachRequest, db: SQLModelSession = Depends(get_db)) -> dict[str, Any]:
     """
     Run virtual coach analysis on session performance.
@@ -61,35 +184,31 @@ def analyze_performance(request: VirtualCoachRequest, db: SQLModelSession = Depe
     Analyzes equipment safety, setup efficiency, and performance metrics
     to provide actionable recommendations.
     """
-    # Fetch bow and arrow
-    bow = db.get(BowSetup, request.bow_id)
-    if not bow:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bow setup not found")
-
-    arrow = db.get(ArrowSetup, request.arrow_id)
-    if not arrow:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Arrow setup not found")
-
-    # Run analysis
-    coach = VirtualCoach(bow, arrow)
-    results = coach.analyze_session_performance(
-        short_score=request.short_score,
-        short_dist=request.short_distance_m,
-        short_face=request.short_face_cm,
-        long_score=request.long_score,
-        long_dist=request.long_distance_m,
-        long_face=request.long_face_cm,
+    bow, arrow = _fetch_bow_and_arrow(db, request.bow_id, request.arrow_id)
+
+    # Run analysis (memoised on equipment values + scores)
+    results = _cached_coach_analysis(
+        _row_key(bow),
+        _row_key(arrow),
+        request.short_score,
+        request.short_distance_m,
+        request.short_face_cm,
+        request.long_score,
+        request.long_distance_m,
+        request.long_face_cm,
     )
 
     return results
 
 
-@router.post("/predict-score")
-def predict_score(request: PredictScoreRequest) -> dict[str, Any]:
+@router.post("/predict-score", response_model=PredictScoreResponse)
+async def predict_score(request: PredictScoreRequest) -> PredictScoreResponse:
     """
     Predict score at a target distance based on known performance.
 
     Uses angular error modeling to project skill to different distances.
+    Pure in-memory math of a few microseconds, so it runs directly on the
+    event loop rather than taking a threadpool worker.
     """
     predicted_score, predicted_sigma = predict_score_at_distance(
         known_score=request.known_score,
@@ -99,24 +218,51 @@ def predict_score(request: PredictScoreRequest) -> dict[str, Any]:
         target_face_cm=request.target_face_cm,
     )
 
-    return {"predicted_score": round(predicted_score, 2), "predicted_sigma": round(predicted_sigma, 2)}
+    return PredictScoreResponse(predicted_score=round(predicted_score, 2), predicted_sigma=round(predicted_sigma, 2))
 
 
-@router.post("/setup-efficiency")
-def check_setup_efficiency(request: SetupEfficiencyRequest, db: SQLModelSession = Depends(get_db)) -> dict[str, Any]:
+@router.post("/predict-score/batch", response_model=PredictScoreBatchResponse)
+def predict_score_sweep(request: PredictScoreBatchRequest) -> PredictScoreBatchResponse:
+    """
+    Predict scores for many target distance/face pairs in one request.
+
+    Vectorised equivalent of ``/predict-score`` for "what-if" sweeps, capped at
+    ``MAX_BATCH_TARGETS`` targets. Cost grows with the batch, so unlike the
+    single prediction it runs in the threadpool rather than on the event loop.
+    """
+    if len(request.target_distances_m) != len(request.target_faces_cm):
+        raise HTTPException(status_code=422, detail="target_distances_m and target_faces_cm must be the same length")
+
+    predicted_scores, predicted_sigmas = predict_score_batch(
+        known_score=request.known_score,
+        known_distance_m=request.known_distance_m,
+        known_face_cm=request.known_face_cm,
+        target_distance_m=request.target_distances_m,
+        target_face_cm=request.target_faces_cm,
+    )
+
+    return PredictScoreBatchResponse(
+        predicted_scores=predicted_scores.round(2).tolist(),
+        predicted_sigmas=predicted_sigmas.round(2).tolist(),
+    )
+
+
+@router.post("/setup-efficiency", response_model=SetupEfficiencyResponse)
+def check_setup_efficiency(
+    request: SetupEfficiencyRequest,
+    http_request: Request,
+    response: Response,
+    db: SQLModelSession = Depends(get_db),
+) -> dict[str, Any]:
     """
     Score setup efficiency based on discipline (indoor/outdoor).
 
     Evaluates GPP, arrow diameter, and other factors against best practices.
+    Responses carry an ETag of the equipment values; a matching
+    ``If-None-Match`` returns 304 without re-scoring.
     """
-    # Fetch bow and arrow
-    bow = db.get(BowSetup, request.bow_id)
-    if not bow:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bow setup not found")
-
-    arrow = db.get(ArrowSetup, request.arrow_id)
-    if not arrow:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Arrow setup not found")
+    bow, arrow = _fetch_bow_and_arrow(db, request.bow_id, request.arrow_id)
+    etag_or_304(http_request, response, _row_key(bow), _row_key(arrow), request.discipline)
 
     # Run analysis
     results = score_setup_efficiency(bow, arrow, request.discipline)
@@ -124,23 +270,23 @@ def check_setup_efficiency(request: SetupEfficiencyRequest, db: SQLModelSession
     return results
 
 
-@router.post("/safety-check")
-def check_safety(request: SafetyCheckRequest, db: SQLModelSession = Depends(get_db)) -> dict[str, list[str]]:
+@router.post("/safety-check", response_model=SafetyCheckResponse)
+def check_safety(
+    request: SafetyCheckRequest,
+    http_request: Request,
+    response: Response,
+    db: SQLModelSession = Depends(get_db),
+) -> SafetyCheckResponse:
     """
     Check equipment setup for safety issues.
 
     Returns warnings about potentially dangerous configurations (e.g., low GPP).
+    Supports ``If-None-Match`` like ``/setup-efficiency``.
     """
-    # Fetch bow and arrow
-    bow = db.get(BowSetup, request.bow_id)
-    if not bow:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bow setup not found")
-
-    arrow = db.get(ArrowSetup, request.arrow_id)
-    if not arrow:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Arrow setup not found")
+    bow, arrow = _fetch_bow_and_arrow(db, request.bow_id, request.arrow_id)
+    etag_or_304(http_request, response, _row_key(bow), _row_key(arrow))
 
     # Run safety check
     warnings = analyze_setup_safety(bow, arrow)
 
-    return {"warnings": warnings}
+    return SafetyCheckResponse(warnings=warnings)
@@ -1,14 +1,19 @@
 """Analytics aggregation endpoints — split into logical sub-modules."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from ._cache import check_data_etag
 from .goals import router as goals_router
+from .overview import router as overview_router
 from .precision import router as precision_router
 from .summary import router as summary_router
 from .trends import router as trends_router
 
-router = APIRouter()
+# Every analytics route is a pure function of its query and the stored data,
+# so clients can revalidate with If-None-Match instead of re-running it.
+router = APIRouter(dependencies=[Depends(check_data_etag)])
 router.include_router(summary_router)
 router.include_router(precision_router)
 router.include_router(trends_router)
 router.include_router(goals_router)
+router.include_router(overview_router)
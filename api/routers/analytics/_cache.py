@@ -0,0 +1,84 @@
+"""In-process response cache for read-only analytics endpoints."""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import wraps
+
+from fastapi import Request, Response
+
+from api.deps import etag_or_304
+from src.db import get_data_version
+
+# Entries are keyed on the data version, so any commit in this process
+# invalidates them immediately; the TTL bounds staleness for writes made by
+# other worker processes.
+CACHE_TTL_SECONDS = 60.0
+CACHE_MAX_ENTRIES = 128
+
+
+def cached_response(func: Callable) -> Callable:
+    """
+    Memoise an analytics route (or data loader) on its arguments and the data version.
+
+    The ``db`` session, which must be passed by keyword, is excluded from the key. Cached results are shared
+    between requests and must not be mutated after being returned.
+    """
+    entries: OrderedDict = OrderedDict()
+    lock = threading.Lock()
+
+    @wraps(func)
+    def wrapper(*args, db, **kwargs):
+        key = (get_data_version(), args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        with lock:
+            hit = entries.get(key)
+            if hit is not None and now - hit[0] < CACHE_TTL_SECONDS:
+                entries.move_to_end(key)
+                return hit[1]
+
+        result = func(*args, db=db, **kwargs)
+
+        with lock:
+            entries[key] = (now, result)
+            entries.move_to_end(key)
+            # Evict from the least recently used end while over capacity or stale
+            # (expired, or for a superseded data version), so large results such
+            # as shot lists aren't held after they can no longer be served
+            while entries:
+                (version, *_), (stamp, _) = next(iter(entries.items()))
+                if len(entries) <= CACHE_MAX_ENTRIES and version == key[0] and now - stamp < CACHE_TTL_SECONDS:
+                    break
+                entries.popitem(last=False)
+        return result
+
+    wrapper.cache_clear = entries.clear
+    return wrapper
+
+
+# The data version restarts with the process, so tags also carry a per-process
+# token; otherwise a client could revalidate against a previous run's data.
+_PROCESS_TOKEN = uuid.uuid4().hex
+
+
+def check_data_etag(request: Request, response: Response) -> None:
+    """
+    Router dependency: tag a GET with an ETag of its URL and the data version,
+    and answer 304 Not Modified (skipping the route) when the client holds it.
+
+    Like the response cache, tags roll over every ``CACHE_TTL_SECONDS`` so
+    writes made by other processes surface within the same bound.
+    """
+    if request.method != "GET":
+        return
+    etag_or_304(
+        request,
+        response,
+        _PROCESS_TOKEN,
+        get_data_version(),
+        int(time.time() // CACHE_TTL_SECONDS),
+        request.url.path,
+        request.url.query,
+    )
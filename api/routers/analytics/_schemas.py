@@ -320,3 +320,13 @@ class ArrowPerformanceSummary(BaseModel):
     tiers: list[ArrowTier]
     primary_set: list[int]  # recommended competition arrows
     group_size: int  # how many in primary set
+
+
+class AnalyticsOverview(BaseModel):
+    """The filter-keyed analyses of the Analytics page in one response."""
+
+    score_context: list[SessionScoreContext]
+    bias: BiasAnalysis
+    advanced_precision: AdvancedPrecision
+    within_end: WithinEndAnalysis
+    trends: TrendAnalysis
@@ -1,13 +1,165 @@
 from datetime import datetime
 
-from fastapi import HTTPException
+import numpy as np
+from fastapi import Query
+from pydantic import BaseModel, ConfigDict, field_validator
+from sqlmodel import Session as SQLModelSession
+from sqlmodel import func, select
 
+from src import precision
+from src.models import End, Shot
+from src.models import Session as SessionModel
 
-def _parse_date(value: str) -> datetime:
-    """Parse ISO date string, raising 422 on invalid format."""
-    try:
-        return datetime.fromisoformat(value)
-    except (ValueError, TypeError) as err:
-        raise HTTPException(
-            status_code=422, detail=f"Invalid date format: '{value}'. Expected ISO 8601 (e.g. 2025-01-15)"
-        ) from err
+from ._cache import cached_response
+
+
+class SessionFilters(BaseModel):
+    """Round-type / date-range filters, parsed once per request by ``session_filters``.
+
+    Frozen (hashable) so it can key the ``cached_response`` memos.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    round_types: tuple[str, ...] | None = None
+    from_date: datetime | None = None
+    to_date: datetime | None = None
+
+    @field_validator("round_types", mode="before")
+    @classmethod
+    def _split_round_types(cls, value):
+        """Accept the comma-separated query form; empty means unfiltered."""
+        if isinstance(value, str):
+            value = [rt.strip() for rt in value.split(",")]
+        return tuple(value) if value else None
+
+
+def session_filters(
+    round_type: str | None = Query(None, description="Comma-separated round types to filter"),
+    from_date: datetime | None = Query(None, description="Start date filter (ISO format)"),
+    to_date: datetime | None = Query(None, description="End date filter (ISO format)"),
+) -> SessionFilters:
+    """Dependency: the common analytics query filters."""
+    return SessionFilters(round_types=round_type, from_date=from_date, to_date=to_date)
+
+
+def _filter_sessions(statement, filters: SessionFilters):
+    """Apply the common round-type / date-range query filters to a statement involving Session."""
+    if filters.round_types:
+        statement = statement.where(SessionModel.round_type.in_(filters.round_types))
+
+    if filters.from_date:
+        statement = statement.where(SessionModel.date >= filters.from_date)
+
+    if filters.to_date:
+        statement = statement.where(SessionModel.date <= filters.to_date)
+
+    return statement
+
+
+def _shot_moment_columns() -> tuple:
+    """SQL aggregates: shot count, score total, then the sums of x, y, x² and y²."""
+    return (
+        func.count(Shot.id),
+        func.sum(Shot.score),
+        func.sum(Shot.x),
+        func.sum(Shot.y),
+        func.sum(Shot.x * Shot.x),
+        func.sum(Shot.y * Shot.y),
+    )
+
+
+def _variance_from_sums(count: int, total: float, total_sq: float) -> float:
+    """Population variance from a count and the sums of values and squares."""
+    return max(total_sq / count - (total / count) ** 2, 0.0)
+
+
+# Column layout of the shared shot table; "session" indexes the session-id array
+# and "radius" is the stored Shot.radius_cm (so no endpoint recomputes it).
+# Coordinates are float32: cm to ~7 significant figures is far finer than the
+# 2-3 decimal places responses are rounded to, and halves the cached table.
+# Reductions still accumulate in float64 (bincount weights are doubles).
+_SHOT_DTYPE = np.dtype(
+    [
+        ("session", "i8"),
+        ("end_number", "i8"),
+        ("is_first", "?"),
+        ("score", "f8"),
+        ("x", "f4"),
+        ("y", "f4"),
+        ("radius", "f4"),
+    ]
+)
+
+
+# Statements with fixed structure are built once at import. Requests only add
+# their filters, and SQLAlchemy's compiled-statement cache (keyed on that
+# structure) reuses the SQL string, so per-call cost is the WHERE clauses.
+#
+# Shots are ordered within their end by shot_sequence if recorded, else arrow
+# number (unnumbered last).
+_shot_order = (func.coalesce(Shot.shot_sequence, Shot.arrow_number, 999999), Shot.id)
+_shot_position = func.row_number().over(partition_by=End.id, order_by=_shot_order)
+
+# Rows arrive grouped by end in shot order, so each end's first arrow is where
+# End.id changes; that is cheaper than a row_number() window over every shot.
+_SHOT_TABLE_STATEMENT = (
+    select(End.session_id, End.id, End.end_number, Shot.score, Shot.x, Shot.y, Shot.radius_cm)
+    .join(Shot, Shot.end_id == End.id)
+    .join(SessionModel, End.session_id == SessionModel.id)
+    .order_by(End.id, *_shot_order)
+)
+
+
+@cached_response
+def _load_session_shots(filters: SessionFilters, *, db: SQLModelSession) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Every shot of the filtered sessions as one structured array, memoised.
+
+    Returns ``(session_ids, shots)``: ``shots["session"]`` indexes the sorted
+    ``session_ids`` array.
+
+    The summary, score-context and bias endpoints all reduce this table, so a
+    dashboard load hits the database once per filter set. Results are cached
+    on the filters and the data version (see ``cached_response``) and shared
+    between requests, so both arrays are read-only.
+    """
+    statement = _filter_sessions(_SHOT_TABLE_STATEMENT, filters)
+    rows = db.exec(statement).all()
+    session_col, end_col, *value_cols = zip(*rows, strict=True) if rows else ((),) * 7
+    session_ids, session_index = np.unique(np.array(session_col, dtype=object), return_inverse=True)
+    end_ids = np.array(end_col, dtype=object)
+
+    shots = np.empty(len(rows), dtype=_SHOT_DTYPE)
+    shots["session"] = session_index
+    shots["is_first"][:1] = True
+    shots["is_first"][1:] = end_ids[1:] != end_ids[:-1]
+    for name, column in zip(("end_number", "score", "x", "y", "radius"), value_cols, strict=True):
+        shots[name] = column
+
+    session_ids.flags.writeable = False
+    shots.flags.writeable = False
+    return session_ids, shots
+
+
+def _session_shot_totals(db: SQLModelSession, filters: SessionFilters) -> dict[str, tuple[int, int]]:
+    """``{session_id: (shot_count, total_score)}`` for filtered sessions with shots."""
+    session_ids, shots = _load_session_shots(filters, db=db)
+    counts = np.bincount(shots["session"], minlength=len(session_ids))
+    totals = np.bincount(shots["session"], weights=shots["score"], minlength=len(session_ids))
+    return {
+        session_id: (int(count), int(total))
+        for session_id, count, total in zip(session_ids.tolist(), counts, totals, strict=True)
+    }
+
+
+def _session_radial_stats(db: SQLModelSession, filters: SessionFilters) -> dict[str, tuple[float, float]]:
+    """``{session_id: (mean_radius, median_radius)}`` for filtered sessions with shots."""
+    session_ids, shots = _load_session_shots(filters, db=db)
+    stats = precision.compute_group_stats_by_group(shots["session"], shots["x"], shots["y"], shots["radius"])
+    return {
+        session_id: (mean, median)
+        for session_id, mean, median in zip(
+            session_ids.tolist(), stats["mean_radius"].tolist(), stats["cep_50"].tolist(), strict=True
+        )
+    }
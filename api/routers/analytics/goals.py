@@ -1,20 +1,44 @@
 import numpy as np
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import selectinload
 from sqlmodel import Session as SQLModelSession
-from sqlmodel import select
+from sqlmodel import func, select
 
 from api.deps import get_db
-from src.models import End
+from src.models import End, Shot
 from src.models import Session as SessionModel
 
+from ._cache import cached_response
 from ._schemas import ArrowPerformance, ArrowPerformanceSummary, ArrowShotCoord, ArrowTier, ScoreGoalSimulation
-from ._shared import _parse_date
+from ._shared import SessionFilters, _filter_sessions, _shot_moment_columns, _variance_from_sums, session_filters
 
 router = APIRouter()
 
+# Statements are built once; requests only add filters (see _shared).
+_SHOT_MOMENTS_STATEMENT = select(*_shot_moment_columns()).join(End, Shot.end_id == End.id)
+
+# Per-session shot counts: unnumbered shots are only counted, never fetched
+# (COUNT(col) skips NULLs). Oldest first, so the first row gives the face size.
+_ARROW_SESSION_COUNTS_STATEMENT = (
+    select(SessionModel.target_face_size_cm, func.count(Shot.id), func.count(Shot.arrow_number))
+    .outerjoin(End, End.session_id == SessionModel.id)
+    .outerjoin(Shot, Shot.end_id == End.id)
+    .group_by(SessionModel.id)
+    .order_by(SessionModel.date)
+)
+
+# One flat row per numbered shot; no ORM objects
+_NUMBERED_SHOTS_STATEMENT = (
+    select(Shot.arrow_number, Shot.score, Shot.is_x, Shot.x, Shot.y, Shot.radius_cm)
+    .select_from(SessionModel)
+    .join(End, End.session_id == SessionModel.id)
+    .join(Shot, Shot.end_id == End.id)
+    .where(Shot.arrow_number.is_not(None))
+    .order_by(SessionModel.date, End.end_number)
+)
+
 
 @router.get("/score-goal", response_model=ScoreGoalSimulation)
+@cached_response
 def score_goal_simulation(
     goal_total_score: int = Query(..., description="Target total score for round"),
     total_arrows: int = Query(30, description="Number of arrows in round"),
@@ -36,39 +60,26 @@ def score_goal_simulation(
     # Required sigma for goal
     required_sigma = calculate_sigma_from_score(goal_avg_arrow, face_cm)
 
-    # Current sigma from sessions
-    statement = select(SessionModel).options(selectinload(SessionModel.ends).selectinload(End.shots))
+    # Current sigma from every shot, reduced to moment sums in SQL
+    statement = _SHOT_MOMENTS_STATEMENT
     if round_type:
-        round_types = [rt.strip() for rt in round_type.split(",")]
-        statement = statement.where(SessionModel.round_type.in_(round_types))
-    sessions = db.exec(statement).all()
+        statement = _filter_sessions(
+            statement.join(SessionModel, End.session_id == SessionModel.id), SessionFilters(round_types=round_type)
+        )
+    total_shots, total_score, sum_x, sum_y, sum_x2, sum_y2 = db.exec(statement).one()
 
     current_sigma = None
     current_avg = None
     sigma_improvement = None
 
-    if sessions:
-        all_xs = []
-        all_ys = []
-        total_score = 0
-        total_shots = 0
-        for session in sessions:
-            for end in session.ends:
-                for shot in end.shots:
-                    all_xs.append(shot.x)
-                    all_ys.append(shot.y)
-                    total_score += shot.score
-                    total_shots += 1
-        if total_shots > 0:
-            xs = np.array(all_xs)
-            ys = np.array(all_ys)
-            sx = float(np.std(xs))
-            sy = float(np.std(ys))
-            current_sigma = float(np.sqrt(sx**2 + sy**2) / np.sqrt(2))
-            # x,y are already stored in cm — no conversion needed
-            current_avg = total_score / total_shots
-            if current_sigma > 0:
-                sigma_improvement = ((current_sigma - required_sigma) / current_sigma) * 100.0
+    if total_shots > 0:
+        var_x = _variance_from_sums(total_shots, sum_x, sum_x2)
+        var_y = _variance_from_sums(total_shots, sum_y, sum_y2)
+        current_sigma = float(np.sqrt(var_x + var_y) / np.sqrt(2))
+        # x,y are already stored in cm — no conversion needed
+        current_avg = total_score / total_shots
+        if current_sigma > 0:
+            sigma_improvement = ((current_sigma - required_sigma) / current_sigma) * 100.0
 
     feasible = goal_avg_arrow <= 10.0
 
@@ -97,75 +108,66 @@ def score_goal_simulation(
 
 
 @router.get("/arrow-performance", response_model=ArrowPerformanceSummary)
+@cached_response
 def arrow_performance(
-    round_type: str | None = Query(None),
-    from_date: str | None = Query(None),
-    to_date: str | None = Query(None),
+    filters: SessionFilters = Depends(session_filters),
     group_size: int = Query(6, ge=1, description="Number of arrows in the primary competition set"),
     db: SQLModelSession = Depends(get_db),
 ):
     """
     Per-arrow-number performance breakdown to identify strong/weak shafts.
     """
-    statement = select(SessionModel).options(selectinload(SessionModel.ends).selectinload(End.shots))
-    if round_type:
-        round_types = [rt.strip() for rt in round_type.split(",")]
-        statement = statement.where(SessionModel.round_type.in_(round_types))
-    if from_date:
-        statement = statement.where(SessionModel.date >= _parse_date(from_date))
-    if to_date:
-        statement = statement.where(SessionModel.date <= _parse_date(to_date))
-
-    sessions = db.exec(statement).all()
-
-    # Collect shots keyed by arrow_number
-    arrow_data: dict[int, list[dict]] = {}
-    total_with = 0
-    total_without = 0
-    most_common_face = None
-
-    for session in sessions:
-        face_cm = session.target_face_size_cm
-        if most_common_face is None:
-            most_common_face = face_cm
-        for end in session.ends:
-            for shot in end.shots:
-                if shot.arrow_number is not None:
-                    total_with += 1
-                    arrow_data.setdefault(shot.arrow_number, []).append(
-                        {
-                            "score": shot.score,
-                            "x": shot.x,
-                            "y": shot.y,
-                            "is_x": shot.is_x,
-                            "face_cm": face_cm,
-                        }
-                    )
-                else:
-                    total_without += 1
-
+    session_counts = db.exec(_filter_sessions(_ARROW_SESSION_COUNTS_STATEMENT, filters)).all()
+    most_common_face = session_counts[0][0] if session_counts else None
+    total_with = sum(numbered_count for _, _, numbered_count in session_counts)
+    total_without = sum(shot_count for _, shot_count, _ in session_counts) - total_with
+
+    numbered = db.exec(_filter_sessions(_NUMBERED_SHOTS_STATEMENT, filters)).all()
+
+    # Per-arrow reductions over flat columns: group shots by arrow number, then
+    # one bincount per statistic instead of a numpy call per arrow
+    columns = np.array(numbered, dtype=float).reshape(-1, 6)
+    scores, is_x, radii = columns[:, 1], columns[:, 2], columns[:, 5]  # radii stored on save, in cm
+    arrow_numbers, groups = np.unique(columns[:, 0], return_inverse=True)
+
+    def per_arrow(weights):
+        return np.bincount(groups, weights=weights, minlength=len(arrow_numbers))
+
+    counts = per_arrow(None)
+    avg_scores = per_arrow(scores) / counts
+    std_scores = np.sqrt(per_arrow((scores - avg_scores[groups]) ** 2) / counts)
+    avg_radii = per_arrow(radii) / counts
+    x_counts = per_arrow(is_x)
+    ten_counts = per_arrow(scores >= 10)
+    miss_counts = per_arrow(scores == 0)
+
+    # Each arrow's shots, in query order
+    shot_indices = np.split(np.argsort(groups, kind="stable"), np.cumsum(counts.astype(int))[:-1])
+
+    # Values come straight from typed DB columns and numpy reductions, so the
+    # per-shot and per-arrow models skip re-validation (model_construct)
     arrows: list[ArrowPerformance] = []
-    for num in sorted(arrow_data.keys()):
-        shots = arrow_data[num]
-        scores = [s["score"] for s in shots]
-        radii = [np.sqrt(s["x"] ** 2 + s["y"] ** 2) for s in shots]  # x,y already in cm
-        shot_coords = [ArrowShotCoord(x=s["x"], y=s["y"], score=s["score"], is_x=s["is_x"]) for s in shots]
-        avg_r = float(np.mean(radii))
-        std_s = float(np.std(scores))
+    for i, num in enumerate(arrow_numbers.astype(int).tolist()):
+        shot_coords = [
+            ArrowShotCoord.model_construct(x=x, y=y, score=score, is_x=is_x)
+            for _, score, is_x, x, y, _ in map(numbered.__getitem__, shot_indices[i].tolist())
+        ]
+        avg_r = float(avg_radii[i])
+        std_s = float(std_scores[i])
         # Composite precision score: lower is more precise.
         # Combines group tightness (avg_radius) with scoring consistency (std_score).
         # Weighted 60/40 towards spatial tightness — the truer measure of shaft quality.
         precision_score = round(0.6 * avg_r + 0.4 * std_s, 4)
         arrows.append(
-            ArrowPerformance(
+            ArrowPerformance.model_construct(
                 arrow_number=num,
-                total_shots=len(shots),
-                avg_score=round(float(np.mean(scores)), 3),
+                total_shots=int(counts[i]),
+                avg_score=round(float(avg_scores[i]), 3),
                 std_score=round(std_s, 3),
                 avg_radius=round(avg_r, 3),
-                x_count=sum(1 for s in shots if s["is_x"]),
-                ten_count=sum(1 for s in shots if s["score"] >= 10),
-                miss_count=sum(1 for s in shots if s["score"] == 0),
+                x_count=int(x_counts[i]),
+                ten_count=int(ten_counts[i]),
+                miss_count=int(miss_counts[i]),
                 shots=shot_coords,
                 precision_score=precision_score,
                 precision_rank=0,  # filled below
@@ -174,52 +176,64 @@ def arrow_performance(
         )
 
     # --- Rank & tier assignment ---
-    # Sort by precision_score ascending (lower = better)
-    ranked = sorted(arrows, key=lambda a: a.precision_score)
-    for rank_idx, arrow in enumerate(ranked):
-        arrow.precision_rank = rank_idx + 1
-
-    # Assign tiers based on rank relative to group_size
-    actual_group = min(group_size, len(ranked))
-    primary_set: list[int] = []
-    for arrow in ranked:
-        if arrow.precision_rank <= actual_group:
-            arrow.tier = "primary"
-            primary_set.append(arrow.arrow_number)
-        elif arrow.precision_rank <= actual_group + (len(ranked) - actual_group) // 2:
-            arrow.tier = "secondary"
-        else:
-            arrow.tier = "reserve"
-
-    # Build tier summaries
-    tiers: list[ArrowTier] = []
-    for tier_name, tier_label in [("primary", "Primary Set"), ("secondary", "Secondary"), ("reserve", "Reserve")]:
-        tier_arrows = [a for a in ranked if a.tier == tier_name]
-        if tier_arrows:
-            tiers.append(
-                ArrowTier(
-                    name=tier_name,
-                    label=tier_label,
-                    arrow_numbers=[a.arrow_number for a in tier_arrows],
-                    avg_precision_score=round(float(np.mean([a.precision_score for a in tier_arrows])), 3),
-                    avg_score=round(float(np.mean([a.avg_score for a in tier_arrows])), 3),
-                    avg_radius=round(float(np.mean([a.avg_radius for a in tier_arrows])), 3),
-                )
-            )
-
-    best = max(arrows, key=lambda a: a.avg_score).arrow_number if arrows else None
-    worst = min(arrows, key=lambda a: a.avg_score).arrow_number if arrows else None
+    # One stable argsort by precision_score ascending (lower = better), as sorted() would
+    precision_scores = np.array([a.precision_score for a in arrows])
+    order = np.argsort(precision_scores, kind="stable")
+    ranks = np.empty(len(arrows), dtype=int)
+    ranks[order] = np.arange(1, len(arrows) + 1)
+
+    # Tier by rank relative to group_size: 0 = primary, 1 = secondary, 2 = reserve
+    actual_group = min(group_size, len(arrows))
+    tier_codes = (ranks > actual_group).astype(int) + (ranks > actual_group + (len(arrows) - actual_group) // 2)
+
+    tier_names = [("primary", "Primary Set"), ("secondary", "Secondary"), ("reserve", "Reserve")]
+    for arrow, rank, code in zip(arrows, ranks.tolist(), tier_codes.tolist(), strict=True):
+        arrow.precision_rank = rank
+        arrow.tier = tier_names[code][0]
+    primary_set = [arrows[i].arrow_number for i in order.tolist() if tier_codes[i] == 0]
+
+    # Tier summaries: per-tier means of the reported (rounded) values in one bincount
+    # each, accumulated in rank order
+    ranked_codes = tier_codes[order]
+    tier_counts = np.bincount(ranked_codes, minlength=3)
+
+    def tier_means(values):
+        return np.bincount(ranked_codes, weights=np.asarray(values)[order], minlength=3) / np.maximum(tier_counts, 1)
+
+    tier_precision = tier_means(precision_scores)
+    tier_scores = tier_means([a.avg_score for a in arrows])
+    tier_radii = tier_means([a.avg_radius for a in arrows])
+    tiers = [
+        ArrowTier(
+            name=tier_name,
+            label=tier_label,
+            arrow_numbers=[arrows[i].arrow_number for i in order.tolist() if tier_codes[i] == code],
+            avg_precision_score=round(float(tier_precision[code]), 3),
+            avg_score=round(float(tier_scores[code]), 3),
+            avg_radius=round(float(tier_radii[code]), 3),
+        )
+        for code, (tier_name, tier_label) in enumerate(tier_names)
+        if tier_counts[code]
+    ]
+
+    # Best/worst by average score in one pass each (first arrow wins ties, as max/min do)
+    arrow_avgs = np.array([a.avg_score for a in arrows])
+    best = worst = None
+    if arrows:
+        best_idx, worst_idx = int(arrow_avgs.argmax()), int(arrow_avgs.argmin())
+        best, worst = arrows[best_idx].arrow_number, arrows[worst_idx].arrow_number
+        best_avg, worst_avg = arrows[best_idx].avg_score, arrows[worst_idx].avg_score
 
     if not arrows:
         interp = "No arrow-numbered shots recorded yet. Select arrows in the quiver panel during session logging."
     elif len(arrows) == 1:
         interp = "Only one arrow tracked. Shoot more sessions with arrow numbers to compare."
     else:
-        spread = max(a.avg_score for a in arrows) - min(a.avg_score for a in arrows)
+        spread = best_avg - worst_avg
         if spread < 0.3:
             interp = f"Your arrows are very consistent (spread {spread:.2f} pts). No weak links."
         elif spread < 0.7:
-            interp = f"Arrow #{worst} underperforms slightly (avg {min(a.avg_score for a in arrows):.2f} vs best {max(a.avg_score for a in arrows):.2f}). Consider checking straightness."
+            interp = f"Arrow #{worst} underperforms slightly (avg {worst_avg:.2f} vs best {best_avg:.2f}). Consider checking straightness."
         else:
             interp = f"Arrow #{worst} is significantly weaker (spread {spread:.2f} pts). Inspect or replace it."
 
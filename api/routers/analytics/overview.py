@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends
+from sqlmodel import Session as SQLModelSession
+
+from api.deps import get_db
+
+from ._schemas import AnalyticsOverview
+from ._shared import SessionFilters, session_filters
+from .precision import get_advanced_precision, get_bias_analysis, get_within_end_analysis
+from .summary import get_score_context
+from .trends import get_trends
+
+router = APIRouter()
+
+
+@router.get("/overview", response_model=AnalyticsOverview)
+def get_analytics_overview(
+    filters: SessionFilters = Depends(session_filters),
+    db: SQLModelSession = Depends(get_db),
+):
+    """
+    Score context, bias, advanced precision, within-end and trend analyses in one call.
+
+    Each part is the response of its own endpoint for the same filters, computed
+    in-process: they share one read of the shot table and one cache entry per
+    part, and the client makes one round trip instead of five.
+    """
+    return AnalyticsOverview(
+        score_context=get_score_context(filters=filters, db=db),
+        bias=get_bias_analysis(filters=filters, db=db),
+        advanced_precision=get_advanced_precision(filters=filters, db=db),
+        within_end=get_within_end_analysis(filters=filters, db=db),
+        trends=get_trends(filters=filters, db=db),
+    )
@@ -1,14 +1,16 @@
+from datetime import datetime
+
 import numpy as np
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import selectinload
 from sqlmodel import Session as SQLModelSession
-from sqlmodel import select
+from sqlmodel import func, select
 
 from api.deps import get_db
 from src import precision
-from src.models import End
+from src.models import End, Shot
 from src.models import Session as SessionModel
 
+from ._cache import cached_response
 from ._schemas import (
     AdvancedPrecision,
     BiasAnalysis,
@@ -18,16 +20,33 @@ from ._schemas import (
     ShotPosition,
     WithinEndAnalysis,
 )
-from ._shared import _parse_date
+from ._shared import SessionFilters, _filter_sessions, _load_session_shots, _shot_position, session_filters
 
 router = APIRouter()
 
+# Statements are built once; requests only add filters (see _shared).
+# Mean face size across sessions (those without shots still count), averaged in SQL
+_AVG_FACE_SIZE_STATEMENT = select(func.avg(SessionModel.target_face_size_cm))
+
+_SHOT_COORDS_STATEMENT = (
+    select(Shot.x, Shot.y).join(End, Shot.end_id == End.id).join(SessionModel, End.session_id == SessionModel.id)
+)
+
+# One row per shot with its position in the end, numbered by the database
+# (see _shot_position); the outer join adds a score-less row for empty ends
+_WITHIN_END_STATEMENT = (
+    select(End.id, _shot_position - 1, Shot.score)
+    .select_from(SessionModel)
+    .join(End, End.session_id == SessionModel.id)
+    .outerjoin(Shot, Shot.end_id == End.id)
+    .order_by(SessionModel.date, End.end_number, End.id)
+)
+
 
 @router.get("/bias-analysis", response_model=BiasAnalysis)
+@cached_response
 def get_bias_analysis(
-    round_type: str | None = Query(None, description="Comma-separated round types to filter"),
-    from_date: str | None = Query(None, description="Start date filter (ISO format)"),
-    to_date: str | None = Query(None, description="End date filter (ISO format)"),
+    filters: SessionFilters = Depends(session_filters),
     db: SQLModelSession = Depends(get_db),
 ):
     """
@@ -39,65 +58,13 @@ def get_bias_analysis(
     - End fatigue analysis (declining performance over time)
     - First arrow penalty (if first shot of each end is consistently worse)
     """
-    import math
+    avg_face_size = db.exec(_filter_sessions(_AVG_FACE_SIZE_STATEMENT, filters)).one()
 
-    # Build query
-    statement = (
-        select(SessionModel)
-        .options(selectinload(SessionModel.ends).selectinload(End.shots))
-        .order_by(SessionModel.date)
-    )
+    # Shared shot table (structure of arrays), with each end's first arrow flagged
+    _, shots = _load_session_shots(filters, db=db)
+    first_mask = shots["is_first"]
 
-    # Apply filters
-    if round_type:
-        round_types = [rt.strip() for rt in round_type.split(",")]
-        statement = statement.where(SessionModel.round_type.in_(round_types))
-
-    if from_date:
-        start = _parse_date(from_date)
-        statement = statement.where(SessionModel.date >= start)
-
-    if to_date:
-        end_dt = _parse_date(to_date)
-        statement = statement.where(SessionModel.date <= end_dt)
-
-    sessions = db.exec(statement).all()
-
-    # Collect all shots data
-    all_x = []
-    all_y = []
-    all_scores = []
-    end_data = {}  # end_number -> list of scores
-    first_arrow_scores = []
-    other_arrow_scores = []
-    face_sizes = []
-
-    for session in sessions:
-        face_sizes.append(session.target_face_size_cm)
-        for end in session.ends:
-            end_num = end.end_number
-            if end_num not in end_data:
-                end_data[end_num] = []
-
-            # Sort by shot_sequence if available, else fallback to (arrow_number, id) for backward compatibility
-            def shot_sort_key(s):
-                if s.shot_sequence is not None:
-                    return (s.shot_sequence, s.id)
-                return (s.arrow_number or 999999, s.id)
-
-            for idx, shot in enumerate(sorted(end.shots, key=shot_sort_key)):
-                all_x.append(shot.x)
-                all_y.append(shot.y)
-                all_scores.append(shot.score)
-                end_data[end_num].append(shot.score)
-
-                # Track first vs other arrows (first shot is index 0)
-                if idx == 0:
-                    first_arrow_scores.append(shot.score)
-                else:
-                    other_arrow_scores.append(shot.score)
-
-    total_shots = len(all_x)
+    total_shots = len(shots)
 
     # Handle no data case
     if total_shots == 0:
@@ -124,13 +91,14 @@ def get_bias_analysis(
             first_arrow_interpretation="No first-arrow effect",
         )
 
-    # Calculate average face size for normalization
-    avg_face_size = float(np.mean(face_sizes))
-    face_radius = avg_face_size / 2.0
+    # Face radius for normalization
+    face_radius = float(avg_face_size) / 2.0
+
+    group = precision.compute_group_stats(shots["x"], shots["y"])
 
     # 1. Mean Point of Impact (MPI)
-    mpi_x = float(np.mean(all_x))
-    mpi_y = float(np.mean(all_y))
+    mpi_x = group["mpi_x"]
+    mpi_y = group["mpi_y"]
     mpi_x_norm = mpi_x / face_radius  # Normalize to -1 to 1
     mpi_y_norm = mpi_y / face_radius
 
@@ -142,17 +110,12 @@ def get_bias_analysis(
     if bias_mag_norm < 0.02:  # Less than 2% of radius = centered
         bias_direction = "Center"
     else:
-        # atan2(y, x) gives angle where 0=East, pi/2=North
-        angle = math.atan2(mpi_y, mpi_x)
-        # Convert to compass directions (N, NE, E, SE, S, SW, W, NW)
-        directions = ["E", "NE", "N", "NW", "W", "SW", "S", "SE"]
-        idx = round(angle / (math.pi / 4)) % 8
-        bias_direction = directions[idx]
+        bias_direction = str(precision.compass_direction(mpi_x, mpi_y))
 
     # 3. H/V Bias Ratio
     if total_shots > 1:
-        sigma_x = float(np.std(all_x))
-        sigma_y = float(np.std(all_y))
+        sigma_x = group["sigma_x"]
+        sigma_y = group["sigma_y"]
         hv_ratio = sigma_x / sigma_y if sigma_y > 0 else 1.0
 
         if hv_ratio > 1.2:
@@ -168,11 +131,13 @@ def get_bias_analysis(
         hv_interpretation = "Balanced"
 
     # 4. End Fatigue Analysis
-    end_scores_list = []
-    for end_num in sorted(end_data.keys()):
-        scores = end_data[end_num]
-        avg_score = float(np.mean(scores))
-        end_scores_list.append(EndScore(end_number=end_num, avg_score=round(avg_score, 2), shot_count=len(scores)))
+    end_numbers, end_groups = np.unique(shots["end_number"], return_inverse=True)
+    end_counts = np.bincount(end_groups)
+    end_means = np.bincount(end_groups, weights=shots["score"]) / end_counts
+    end_scores_list = [
+        EndScore(end_number=int(end_num), avg_score=round(float(avg_score), 2), shot_count=int(count))
+        for end_num, avg_score, count in zip(end_numbers, end_means, end_counts, strict=True)
+    ]
 
     # Calculate fatigue correlation and slope
     if len(end_scores_list) > 1:
@@ -181,8 +146,9 @@ def get_bias_analysis(
 
         # Check if there's variation in scores (avoid NaN from zero variance)
         if np.std(avg_scores) > 0.01:
-            fatigue_corr = float(np.corrcoef(end_nums, avg_scores)[0, 1])
-            fatigue_slope = float(np.polyfit(end_nums, avg_scores, 1)[0])
+            trend = precision.compute_linear_trend(end_nums, avg_scores)
+            fatigue_corr = trend["correlation"]
+            fatigue_slope = trend["slope"]
         else:
             # No variation in scores = no fatigue
             fatigue_corr = 0.0
@@ -203,9 +169,9 @@ def get_bias_analysis(
         fatigue_interp = "No fatigue detected"
 
     # 5. First Arrow Analysis
-    if first_arrow_scores:
-        first_avg = float(np.mean(first_arrow_scores))
-        other_avg = float(np.mean(other_arrow_scores)) if other_arrow_scores else first_avg
+    if first_mask.any():
+        first_avg = float(shots["score"][first_mask].mean())
+        other_avg = float(shots["score"][~first_mask].mean()) if not first_mask.all() else first_avg
         first_penalty = first_avg - other_avg
 
         if first_penalty < -0.3:
@@ -245,10 +211,9 @@ def get_bias_analysis(
 
 
 @router.get("/advanced-precision", response_model=AdvancedPrecision)
+@cached_response
 def get_advanced_precision(
-    round_type: str | None = Query(None, description="Comma-separated round types to filter"),
-    from_date: str | None = Query(None, description="Start date filter (ISO format)"),
-    to_date: str | None = Query(None, description="End date filter (ISO format)"),
+    filters: SessionFilters = Depends(session_filters),
     db: SQLModelSession = Depends(get_db),
 ):
     """
@@ -257,41 +222,11 @@ def get_advanced_precision(
     Returns DRMS, R95, extreme spread, Rayleigh sigma with CI,
     accuracy/precision decomposition, confidence ellipse, and flier detection.
     """
-    # Build query
-    statement = (
-        select(SessionModel)
-        .options(selectinload(SessionModel.ends).selectinload(End.shots))
-        .order_by(SessionModel.date)
-    )
+    # Coordinates come from the shared shot table; the mean face size is averaged in SQL
+    _, shots = _load_session_shots(filters, db=db)
+    avg_face_size = db.exec(_filter_sessions(_AVG_FACE_SIZE_STATEMENT, filters)).one()
 
-    # Apply filters
-    if round_type:
-        round_types = [rt.strip() for rt in round_type.split(",")]
-        statement = statement.where(SessionModel.round_type.in_(round_types))
-
-    if from_date:
-        start = _parse_date(from_date)
-        statement = statement.where(SessionModel.date >= start)
-
-    if to_date:
-        end_dt = _parse_date(to_date)
-        statement = statement.where(SessionModel.date <= end_dt)
-
-    sessions = db.exec(statement).all()
-
-    # Collect all shots
-    all_x = []
-    all_y = []
-    face_sizes = []
-
-    for session in sessions:
-        face_sizes.append(session.target_face_size_cm)
-        for end in session.ends:
-            for shot in end.shots:
-                all_x.append(shot.x)
-                all_y.append(shot.y)
-
-    total_shots = len(all_x)
+    total_shots = len(shots)
 
     if total_shots == 0:
         return AdvancedPrecision(
@@ -318,9 +253,8 @@ def get_advanced_precision(
             flier_interpretation="No data",
         )
 
-    xs = np.array(all_x)
-    ys = np.array(all_y)
-    avg_face_size = float(np.mean(face_sizes))
+    xs = shots["x"].astype(float)
+    ys = shots["y"].astype(float)
 
     # Compute metrics using precision module
     drms = precision.compute_drms(xs, ys)
@@ -330,7 +264,7 @@ def get_advanced_precision(
     accuracy_result = precision.compute_accuracy_precision_ratio(xs, ys)
 
     # Normalize coordinates for ellipse (to -1 to 1 range)
-    face_radius = avg_face_size / 2.0
+    face_radius = float(avg_face_size) / 2.0
     xs_norm = xs / face_radius
     ys_norm = ys / face_radius
     ellipse_result = precision.compute_confidence_ellipse(xs_norm, ys_norm)
@@ -363,10 +297,9 @@ def get_advanced_precision(
 
 
 @router.get("/within-end", response_model=WithinEndAnalysis)
+@cached_response
 def get_within_end_analysis(
-    round_type: str | None = Query(None, description="Comma-separated round types to filter"),
-    from_date: str | None = Query(None, description="Start date filter (ISO format)"),
-    to_date: str | None = Query(None, description="End date filter (ISO format)"),
+    filters: SessionFilters = Depends(session_filters),
     db: SQLModelSession = Depends(get_db),
 ):
     """
@@ -375,50 +308,18 @@ def get_within_end_analysis(
     Analyzes whether certain shot positions within an end (1st, 2nd, 3rd, etc.)
     consistently score higher or lower.
     """
-    # Build query
-    statement = (
-        select(SessionModel)
-        .options(selectinload(SessionModel.ends).selectinload(End.shots))
-        .order_by(SessionModel.date)
-    )
-
-    # Apply filters
-    if round_type:
-        round_types = [rt.strip() for rt in round_type.split(",")]
-        statement = statement.where(SessionModel.round_type.in_(round_types))
-
-    if from_date:
-        start = _parse_date(from_date)
-        statement = statement.where(SessionModel.date >= start)
-
-    if to_date:
-        end_dt = _parse_date(to_date)
-        statement = statement.where(SessionModel.date <= end_dt)
-
-    sessions = db.exec(statement).all()
-
-    # Collect shots by position
-    shots_by_position = {}
-    arrows_per_end_counts = []
-    total_ends = 0
-
-    for session in sessions:
-        for end in session.ends:
-            total_ends += 1
-            arrows_per_end_counts.append(len(end.shots))
-
-            # Sort by shot_sequence if available, else fallback to (arrow_number, id) for backward compatibility
-            def shot_sort_key(s):
-                if s.shot_sequence is not None:
-                    return (s.shot_sequence, s.id)
-                return (s.arrow_number or 999999, s.id)
-
-            for idx, shot in enumerate(sorted(end.shots, key=shot_sort_key)):
-                if idx not in shots_by_position:
-                    shots_by_position[idx] = []
-                shots_by_position[idx].append(float(shot.score))
-
-    if not shots_by_position:
+    statement = _filter_sessions(_WITHIN_END_STATEMENT, filters)
+
+    # Flat columns instead of per-position lists of boxed floats; shotless ends
+    # carry a NaN score. End ids are coded in first-appearance (query) order.
+    rows = db.exec(statement).all()
+    end_col, position_col, score_col = zip(*rows, strict=True) if rows else ((), (), ())
+    _, end_first, end_codes = np.unique(np.array(end_col, dtype=object), return_index=True, return_inverse=True)
+    scores = np.array(score_col, dtype=float)
+    has_shot = ~np.isnan(scores)
+    total_ends = len(end_first)
+
+    if not has_shot.any():
         return WithinEndAnalysis(
             positions=[],
             best_position=0,
@@ -428,10 +329,23 @@ def get_within_end_analysis(
             arrows_per_end_mode=0,
         )
 
-    # Compute mode of arrows per end
+    # Mode of arrows per end (Counter keeps first-seen order for ties)
     from collections import Counter
 
-    arrows_per_end_mode = Counter(arrows_per_end_counts).most_common(1)[0][0] if arrows_per_end_counts else 0
+    arrows_per_end = np.bincount(end_codes[has_shot], minlength=total_ends)[np.argsort(end_first)]
+    arrows_per_end_mode = Counter(arrows_per_end.tolist()).most_common(1)[0][0]
+
+    # Each position's scores as a slice of one sorted array
+    positions = np.array(position_col, dtype=int)[has_shot]
+    order = np.argsort(positions, kind="stable")
+    position_values, position_counts = np.unique(positions, return_counts=True)
+    shots_by_position = dict(
+        zip(
+            position_values.tolist(),
+            np.split(scores[has_shot][order], np.cumsum(position_counts)[:-1]),
+            strict=True,
+        )
+    )
 
     # Use precision module function
     trend_result = precision.compute_within_end_trend(shots_by_position)
@@ -450,10 +364,11 @@ def get_within_end_analysis(
 
 
 @router.get("/hit-probability", response_model=HitProbabilityAnalysis)
+@cached_response
 def get_hit_probability(
     round_type: str = Query(..., description="Round type (required)"),
-    from_date: str | None = Query(None, description="Start date filter (ISO format)"),
-    to_date: str | None = Query(None, description="End date filter (ISO format)"),
+    from_date: datetime | None = Query(None, description="Start date filter (ISO format)"),
+    to_date: datetime | None = Query(None, description="End date filter (ISO format)"),
     db: SQLModelSession = Depends(get_db),
 ):
     """
@@ -462,37 +377,20 @@ def get_hit_probability(
     Computes the probability of hitting each scoring ring (10 down to miss)
     based on bivariate normal distribution fitted to shot data.
     """
-    # Build query
-    statement = (
-        select(SessionModel)
-        .options(selectinload(SessionModel.ends).selectinload(End.shots))
-        .where(SessionModel.round_type == round_type)
-    )
-
-    # Apply date filters
-    if from_date:
-        start = _parse_date(from_date)
-        statement = statement.where(SessionModel.date >= start)
+    date_filters = SessionFilters(from_date=from_date, to_date=to_date)
 
-    if to_date:
-        end_dt = _parse_date(to_date)
-        statement = statement.where(SessionModel.date <= end_dt)
+    # Flat coordinate rows straight into arrays, without loading ORM objects
+    coords = np.array(
+        db.exec(
+            _filter_sessions(_SHOT_COORDS_STATEMENT.where(SessionModel.round_type == round_type), date_filters)
+        ).all(),
+        dtype=float,
+    ).reshape(-1, 2)
+    avg_face_size = db.exec(
+        _filter_sessions(_AVG_FACE_SIZE_STATEMENT.where(SessionModel.round_type == round_type), date_filters)
+    ).one()
 
-    sessions = db.exec(statement).all()
-
-    # Collect shots
-    xs = []
-    ys = []
-    face_sizes = []
-
-    for session in sessions:
-        face_sizes.append(session.target_face_size_cm)
-        for end in session.ends:
-            for shot in end.shots:
-                xs.append(shot.x)
-                ys.append(shot.y)
-
-    total_shots = len(xs)
+    total_shots = len(coords)
 
     if total_shots == 0:
         return HitProbabilityAnalysis(
@@ -507,16 +405,11 @@ def get_hit_probability(
             expected_score=0.0,
         )
 
-    xs_arr = np.array(xs)
-    ys_arr = np.array(ys)
-
-    # Compute statistics
-    sigma_x = float(np.std(xs_arr, ddof=0))
-    sigma_y = float(np.std(ys_arr, ddof=0))
-    mpi_x = float(np.mean(xs_arr))
-    mpi_y = float(np.mean(ys_arr))
+    # Both axes in one reduction over the (n, 2) buffer rather than four passes
+    mpi_x, mpi_y = coords.mean(axis=0).tolist()
+    sigma_x, sigma_y = np.sqrt(np.square(coords - (mpi_x, mpi_y)).mean(axis=0)).tolist()
 
-    face_size_cm = int(np.mean(face_sizes))
+    face_size_cm = int(avg_face_size)
 
     # Compute hit probability
     hit_prob_result = precision.compute_hit_probability(sigma_x, sigma_y, mpi_x, mpi_y, face_size_cm)
@@ -1,28 +1,131 @@
 from datetime import datetime
 
 import numpy as np
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import selectinload
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlmodel import Session as SQLModelSession
 from sqlmodel import select
 
 from api.deps import get_db
-from src.models import End
+from src import precision
+from src.models import ArrowSetup, BowSetup, End, Shot
 from src.models import Session as SessionModel
 from src.park_model import calculate_sigma_from_score
 from src.rounds import get_round_preset
 
+from ._cache import cached_response
 from ._schemas import DashboardStats, PersonalBest, SessionScoreContext, SessionSummaryStats, ShotDetail
-from ._shared import _parse_date
+from ._shared import (
+    SessionFilters,
+    _filter_sessions,
+    _load_session_shots,
+    _session_radial_stats,
+    _session_shot_totals,
+    session_filters,
+)
 
 router = APIRouter()
 
+# Rows fetched per round trip when streaming shots
+_STREAM_BATCH_SIZE = 1000
+
+# Statements are built once; requests only add filters (see _shared).
+# Session metadata and equipment names, without hydrating ends/shots:
+_SUMMARY_SESSIONS_STATEMENT = (
+    select(
+        SessionModel.id,
+        SessionModel.date,
+        SessionModel.round_type,
+        SessionModel.distance_m,
+        SessionModel.target_face_size_cm,
+        BowSetup.name,
+        ArrowSetup.make,
+        ArrowSetup.model,
+    )
+    .outerjoin(BowSetup, SessionModel.bow_id == BowSetup.id)
+    .outerjoin(ArrowSetup, SessionModel.arrow_id == ArrowSetup.id)
+    .order_by(SessionModel.date.desc())
+)
+
+_SCORE_CONTEXT_SESSIONS_STATEMENT = select(
+    SessionModel.id,
+    SessionModel.date,
+    SessionModel.round_type,
+    SessionModel.distance_m,
+    SessionModel.target_face_size_cm,
+).order_by(SessionModel.date.desc())
+
+_SHOT_ROWS_STATEMENT = (
+    select(
+        SessionModel.id.label("session_id"),
+        SessionModel.date.label("session_date"),
+        SessionModel.round_type,
+        End.end_number,
+        Shot.arrow_number,
+        Shot.score,
+        Shot.is_x,
+        Shot.x,
+        Shot.y,
+        SessionModel.target_face_size_cm.label("face_size"),
+    )
+    .join(End, End.session_id == SessionModel.id)
+    .join(Shot, Shot.end_id == End.id)
+    .order_by(SessionModel.date, End.end_number)
+)
+_SHOT_STREAM_STATEMENT = _SHOT_ROWS_STATEMENT.execution_options(yield_per=_STREAM_BATCH_SIZE)
+
+
+_DASHBOARD_SESSIONS_STATEMENT = (
+    select(
+        SessionModel.date,
+        SessionModel.round_type,
+        func.coalesce(func.sum(Shot.score), 0).label("total_score"),
+        func.count(Shot.id).label("shot_count"),
+    )
+    .outerjoin(End, End.session_id == SessionModel.id)
+    .outerjoin(Shot, Shot.end_id == End.id)
+    .group_by(SessionModel.id)
+    .order_by(SessionModel.date.desc())
+)
+
+
+def _personal_bests_statement():
+    """Best session per round type, highest total first."""
+    # Per-session totals ranked within each round type (earliest session wins ties);
+    # outer joins keep sessions without shots, which score 0
+    total_score = func.coalesce(func.sum(Shot.score), 0)
+    ranked = (
+        select(
+            SessionModel.id.label("session_id"),
+            SessionModel.round_type,
+            SessionModel.date,
+            total_score.label("total_score"),
+            func.count(Shot.id).label("shot_count"),
+            func.row_number()
+            .over(partition_by=SessionModel.round_type, order_by=(total_score.desc(), SessionModel.date))
+            .label("rank"),
+            func.min(SessionModel.date).over(partition_by=SessionModel.round_type).label("first_date"),
+        )
+        .outerjoin(End, End.session_id == SessionModel.id)
+        .outerjoin(Shot, Shot.end_id == End.id)
+        .group_by(SessionModel.id)
+        .subquery()
+    )
+    return (
+        select(ranked.c.session_id, ranked.c.round_type, ranked.c.date, ranked.c.total_score, ranked.c.shot_count)
+        .where(ranked.c.rank == 1)
+        .order_by(ranked.c.total_score.desc(), ranked.c.first_date)
+    )
+
+
+_PERSONAL_BESTS_STATEMENT = _personal_bests_statement()
+
 
 @router.get("/summary", response_model=list[SessionSummaryStats])
+@cached_response
 def get_session_summaries(
-    round_type: str | None = Query(None, description="Comma-separated round types to filter"),
-    from_date: str | None = Query(None, description="Start date filter (ISO format)"),
-    to_date: str | None = Query(None, description="End date filter (ISO format)"),
+    filters: SessionFilters = Depends(session_filters),
     db: SQLModelSession = Depends(get_db),
 ):
     """
@@ -30,59 +133,39 @@ def get_session_summaries(
 
     Computes: total_score, shot_count, avg_score, mean_radius, sigma_x, sigma_y, cep_50
     """
-    # Build query
-    statement = (
-        select(SessionModel)
-        .options(
-            selectinload(SessionModel.ends).selectinload(End.shots),
-            selectinload(SessionModel.bow),
-            selectinload(SessionModel.arrow),
+    meta_statement = _filter_sessions(_SUMMARY_SESSIONS_STATEMENT, filters)
+    sessions = db.exec(meta_statement).all()
+
+    # Per-session counts, totals and group statistics, reduced over the shared shot table
+    session_ids, shots = _load_session_shots(filters, db=db)
+    groups = shots["session"]
+    counts = np.bincount(groups, minlength=len(session_ids))
+    totals = np.bincount(groups, weights=shots["score"], minlength=len(session_ids))
+    stats = precision.compute_group_stats_by_group(groups, shots["x"], shots["y"], shots["radius"])
+    aggregates = {
+        session_id: row
+        for session_id, *row in zip(
+            session_ids.tolist(),
+            counts.tolist(),
+            totals.astype(int).tolist(),
+            stats["mean_radius"].tolist(),
+            stats["sigma_x"].tolist(),
+            stats["sigma_y"].tolist(),
+            stats["cep_50"].tolist(),
+            strict=True,
         )
-        .order_by(SessionModel.date.desc())
-    )
-
-    # Apply filters
-    if round_type:
-        round_types = [rt.strip() for rt in round_type.split(",")]
-        statement = statement.where(SessionModel.round_type.in_(round_types))
-
-    if from_date:
-        start = _parse_date(from_date)
-        statement = statement.where(SessionModel.date >= start)
-
-    if to_date:
-        end = _parse_date(to_date)
-        statement = statement.where(SessionModel.date <= end)
-
-    sessions = db.exec(statement).all()
+    }
 
     # Calculate statistics for each session
     summaries = []
-    for session in sessions:
-        total_score = 0
-        shot_count = 0
-        shots_x = []
-        shots_y = []
-
-        for end in session.ends:
-            for shot in end.shots:
-                total_score += shot.score
-                shot_count += 1
-                shots_x.append(shot.x)
-                shots_y.append(shot.y)
-
-        # Calculate group statistics
+    for session_id, date, session_round, distance_m, face_cm, bow_name, arrow_make, arrow_model in sessions:
+        shot_count, total_score, mean_radius, sigma_x, sigma_y, cep_50 = aggregates.get(
+            session_id, (0, 0, 0.0, 0.0, 0.0, 0.0)
+        )
+
+        # Group statistics need at least two shots
         if shot_count > 1:
             avg_score = total_score / shot_count
-
-            # Mean radius
-            r_dists = [np.sqrt(x**2 + y**2) for x, y in zip(shots_x, shots_y, strict=True)]
-            mean_radius = float(np.mean(r_dists))
-
-            # Dispersion metrics
-            sigma_x = float(np.std(shots_x))
-            sigma_y = float(np.std(shots_y))
-            cep_50 = float(np.percentile(r_dists, 50))
         else:
             avg_score = float(total_score) if shot_count > 0 else 0.0
             mean_radius = 0.0
@@ -90,13 +173,14 @@ def get_session_summaries(
             sigma_y = 0.0
             cep_50 = 0.0
 
+        # Fields are already the right types; skip per-row validation (see /shots)
         summaries.append(
-            SessionSummaryStats(
-                session_id=session.id,
-                date=session.date,
-                round_type=session.round_type,
-                distance_m=session.distance_m,
-                face_cm=session.target_face_size_cm,
+            SessionSummaryStats.model_construct(
+                session_id=session_id,
+                date=date,
+                round_type=session_round,
+                distance_m=distance_m,
+                face_cm=face_cm,
                 total_score=total_score,
                 shot_count=shot_count,
                 avg_score=round(avg_score, 2),
@@ -104,8 +188,8 @@ def get_session_summaries(
                 sigma_x=round(sigma_x, 2),
                 sigma_y=round(sigma_y, 2),
                 cep_50=round(cep_50, 2),
-                bow_name=session.bow.name if session.bow else None,
-                arrow_name=f"{session.arrow.make} {session.arrow.model}" if session.arrow else None,
+                bow_name=bow_name,
+                arrow_name=f"{arrow_make} {arrow_model}" if arrow_make is not None else None,
             )
         )
 
@@ -113,10 +197,9 @@ def get_session_summaries(
 
 
 @router.get("/shots", response_model=list[ShotDetail])
+@cached_response
 def get_all_shots(
-    round_type: str | None = Query(None, description="Comma-separated round types to filter"),
-    from_date: str | None = Query(None, description="Start date filter (ISO format)"),
-    to_date: str | None = Query(None, description="End date filter (ISO format)"),
+    filters: SessionFilters = Depends(session_filters),
     db: SQLModelSession = Depends(get_db),
 ):
     """
@@ -124,105 +207,64 @@ def get_all_shots(
 
     Useful for arrow consistency analysis and heatmaps.
     """
-    # Build query
-    statement = (
-        select(SessionModel)
-        .options(selectinload(SessionModel.ends).selectinload(End.shots))
-        .order_by(SessionModel.date)
-    )
+    # One flat join rather than loading Session -> End -> Shot ORM graphs (three
+    # round trips plus an object per shot). Values come straight from typed DB
+    # columns, so build the models without re-validating each one
+    # (model_construct); FastAPI then serialises the list in one pydantic-core call.
+    statement = _filter_sessions(_SHOT_ROWS_STATEMENT, filters)
+    shots = [ShotDetail.model_construct(**row._asdict()) for row in db.exec(statement)]
 
-    # Apply filters
-    if round_type:
-        round_types = [rt.strip() for rt in round_type.split(",")]
-        statement = statement.where(SessionModel.round_type.in_(round_types))
+    return shots
 
-    if from_date:
-        start = _parse_date(from_date)
-        statement = statement.where(SessionModel.date >= start)
 
-    if to_date:
-        end = _parse_date(to_date)
-        statement = statement.where(SessionModel.date <= end)
+@router.get("/shots.ndjson", response_class=StreamingResponse)
+def stream_all_shots(
+    response: Response,
+    filters: SessionFilters = Depends(session_filters),
+    db: SQLModelSession = Depends(get_db),
+):
+    """
+    Stream the same records as ``/shots`` as newline-delimited JSON.
 
-    sessions = db.exec(statement).all()
+    Rows are read from a flat join in batches and written as they arrive, so
+    memory stays flat and the first shot is sent before the last is read —
+    use this for large date ranges.
+    """
+    statement = _filter_sessions(_SHOT_STREAM_STATEMENT, filters)
 
-    # Collect all shots
-    shots = []
-    for session in sessions:
-        for end in session.ends:
-            for shot in end.shots:
-                shots.append(
-                    ShotDetail(
-                        session_id=session.id,
-                        session_date=session.date,
-                        round_type=session.round_type,
-                        end_number=end.end_number,
-                        arrow_number=shot.arrow_number,
-                        score=shot.score,
-                        is_x=shot.is_x,
-                        x=shot.x,
-                        y=shot.y,
-                        face_size=session.target_face_size_cm,
-                    )
-                )
+    def lines():
+        for row in db.exec(statement):
+            yield ShotDetail.model_construct(**row._asdict()).model_dump_json().encode() + b"\n"
 
-    return shots
+    # A returned response replaces the injected one, so carry over the router's ETag
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"ETag": response.headers["ETag"]})
 
 
 @router.get("/personal-bests", response_model=list[PersonalBest])
+@cached_response
 def get_personal_bests(db: SQLModelSession = Depends(get_db)):
     """
     Get personal bests grouped by round type.
 
     Returns the highest scoring session for each round type.
     """
-    # Get all sessions with ends and shots
-    statement = (
-        select(SessionModel)
-        .options(selectinload(SessionModel.ends).selectinload(End.shots))
-        .order_by(SessionModel.date)
-    )
-
-    sessions = db.exec(statement).all()
 
-    # Calculate total scores and group by round type
-    round_bests = {}
-
-    for session in sessions:
-        total_score = 0
-        shot_count = 0
-
-        for end in session.ends:
-            for shot in end.shots:
-                total_score += shot.score
-                shot_count += 1
-
-        avg_score = total_score / shot_count if shot_count > 0 else 0.0
-
-        # Check if this is a PB for this round type
-        if session.round_type not in round_bests or total_score > round_bests[session.round_type]["total_score"]:
-            round_bests[session.round_type] = {
-                "round_type": session.round_type,
-                "total_score": total_score,
-                "avg_score": round(avg_score, 2),
-                "date": session.date,
-                "session_id": session.id,
-            }
-
-    # Convert to list of PersonalBest objects
-    pbs = [PersonalBest(**data) for data in round_bests.values()]
-
-    # Sort by total score descending
-    pbs.sort(key=lambda x: x.total_score, reverse=True)
-
-    return pbs
+    return [
+        PersonalBest(
+            round_type=round_type,
+            total_score=total,
+            avg_score=round(total / shot_count, 2) if shot_count > 0 else 0.0,
+            date=date,
+            session_id=session_id,
+        )
+        for session_id, round_type, date, total, shot_count in db.exec(_PERSONAL_BESTS_STATEMENT)
+    ]
 
 
 @router.get("/score-context", response_model=list[SessionScoreContext])
+@cached_response
 def get_score_context(
-    round_type: str | None = Query(None, description="Comma-separated round types to filter"),
-    from_date: str | None = Query(None, description="Start date filter (ISO format)"),
-    to_date: str | None = Query(None, description="End date filter (ISO format)"),
+    filters: SessionFilters = Depends(session_filters),
     db: SQLModelSession = Depends(get_db),
 ):
     """
@@ -230,45 +272,19 @@ def get_score_context(
 
     Adds round preset information to show how close the archer is to a perfect score.
     """
-    # Build query (reuse pattern from summary endpoint)
-    statement = (
-        select(SessionModel)
-        .options(selectinload(SessionModel.ends).selectinload(End.shots))
-        .order_by(SessionModel.date.desc())
-    )
-
-    # Apply filters
-    if round_type:
-        round_types = [rt.strip() for rt in round_type.split(",")]
-        statement = statement.where(SessionModel.round_type.in_(round_types))
-
-    if from_date:
-        start = _parse_date(from_date)
-        statement = statement.where(SessionModel.date >= start)
-
-    if to_date:
-        end = _parse_date(to_date)
-        statement = statement.where(SessionModel.date <= end)
-
-    sessions = db.exec(statement).all()
+    # Session metadata plus shot totals and radii from the shared shot table (same pattern as /summary)
+    session_statement = _filter_sessions(_SCORE_CONTEXT_SESSIONS_STATEMENT, filters)
+    sessions = db.exec(session_statement).all()
+    totals = _session_shot_totals(db, filters)
+    radial = _session_radial_stats(db, filters)
 
     # Calculate context for each session
     results = []
-    for session in sessions:
-        total_score = 0
-        shot_count = 0
-        shots_x = []
-        shots_y = []
-
-        for end in session.ends:
-            for shot in end.shots:
-                total_score += shot.score
-                shot_count += 1
-                shots_x.append(shot.x)
-                shots_y.append(shot.y)
+    for session_id, date, session_round, distance_m, face_cm in sessions:
+        shot_count, total_score = totals.get(session_id, (0, 0))
 
         # Get round preset
-        preset = get_round_preset(session.round_type)
+        preset = get_round_preset(session_round)
 
         # Calculate max score and round completion
         if preset:
@@ -286,21 +302,17 @@ def get_score_context(
 
         # Calculate avg score and sigma
         avg_score = total_score / shot_count if shot_count > 0 else 0.0
-        sigma_cm = calculate_sigma_from_score(avg_score, session.target_face_size_cm) if shot_count > 0 else 0.0
+        sigma_cm = calculate_sigma_from_score(avg_score, face_cm) if shot_count > 0 else 0.0
 
         # Calculate CEP 50
-        if shot_count > 1:
-            r_dists = [np.sqrt(x**2 + y**2) for x, y in zip(shots_x, shots_y, strict=True)]
-            cep_50 = float(np.percentile(r_dists, 50))
-        else:
-            cep_50 = 0.0
+        cep_50 = radial[session_id][1] if shot_count > 1 else 0.0
 
         results.append(
             SessionScoreContext(
-                session_id=session.id,
-                date=session.date,
-                round_type=session.round_type,
-                distance_m=session.distance_m,
+                session_id=session_id,
+                date=date,
+                round_type=session_round,
+                distance_m=distance_m,
                 total_score=total_score,
                 shot_count=shot_count,
                 avg_score=round(avg_score, 2),
@@ -328,14 +340,8 @@ def get_dashboard_stats(db: SQLModelSession = Depends(get_db)):
     - Personal best score and date
     - Sparkline data (last 20 sessions)
     """
-    # Load all sessions with eager loading
-    statement = (
-        select(SessionModel)
-        .options(selectinload(SessionModel.ends).selectinload(End.shots))
-        .order_by(SessionModel.date.desc())
-    )
-
-    sessions = db.exec(statement).all()
+    # Per-session totals, summed in SQL; outer joins keep sessions without shots
+    sessions = db.exec(_DASHBOARD_SESSIONS_STATEMENT).all()
 
     # Handle empty database
     if not sessions:
@@ -354,61 +360,41 @@ def get_dashboard_stats(db: SQLModelSession = Depends(get_db)):
             sparkline_scores=[],
         )
 
-    # Calculate total arrows across all sessions
+    # One pass over the newest-first rows: running arrow count, best total
+    # (earliest max, i.e. the most recent on ties) and per-arrow averages
     total_arrows = 0
-    session_stats = []  # (session, total_score, shot_count, avg_arrow_score)
-
+    best_session = sessions[0]
+    avg_arrow_scores = []
     for session in sessions:
-        total_score = 0
-        shot_count = 0
-
-        for end in session.ends:
-            for shot in end.shots:
-                total_score += shot.score
-                shot_count += 1
-                total_arrows += 1
-
-        avg_arrow_score = total_score / shot_count if shot_count > 0 else 0.0
-        session_stats.append((session, total_score, shot_count, avg_arrow_score))
+        total_arrows += session.shot_count
+        if session.total_score > best_session.total_score:
+            best_session = session
+        avg_arrow_scores.append(session.total_score / session.shot_count if session.shot_count > 0 else 0.0)
 
     # Last session details
-    last_session, last_total_score, last_shot_count, _ = session_stats[0]
+    last_session = sessions[0]
     days_since_last = (datetime.now() - last_session.date).days
 
-    # Personal best (max total score)
-    best_session, best_score, best_shot_count, _ = max(session_stats, key=lambda x: x[1])
-
-    # Rolling average score (EWMA with span=10)
+    # Rolling average score (EWMA with span=10), over every session oldest first
     # EWMA formula: alpha = 2 / (span + 1) = 2 / 11 ≈ 0.1818
-    rolling_avg = None
-    if session_stats:
-        alpha = 2.0 / (10 + 1)
-        # Process sessions in chronological order for EWMA
-        reversed_stats = list(reversed(session_stats))
-        ewma = reversed_stats[0][3]  # Start with first avg_arrow_score
-
-        for i in range(1, len(reversed_stats)):
-            current_avg = reversed_stats[i][3]
-            ewma = alpha * current_avg + (1 - alpha) * ewma
-
-        rolling_avg = ewma
+    alpha = 2.0 / (10 + 1)
+    chronological_avgs = avg_arrow_scores[::-1]
+    ewma = precision.compute_ewma_series(chronological_avgs[1:], alpha, chronological_avgs[0])
+    rolling_avg = float(ewma[-1]) if len(ewma) else chronological_avgs[0]
 
     # Sparkline: last 20 sessions in chronological order
-    sparkline_sessions = session_stats[:20]  # Take last 20 (most recent)
-    sparkline_sessions = list(reversed(sparkline_sessions))  # Reverse to chronological order
-
-    sparkline_dates = [s[0].date.isoformat() for s in sparkline_sessions]
-    sparkline_scores = [s[3] for s in sparkline_sessions]  # avg_arrow_score
+    sparkline_dates = [session.date.isoformat() for session in reversed(sessions[:20])]
+    sparkline_scores = avg_arrow_scores[:20][::-1]
 
     return DashboardStats(
         total_sessions=len(sessions),
         total_arrows=total_arrows,
         days_since_last_practice=days_since_last,
-        last_session_score=last_total_score,
+        last_session_score=last_session.total_score,
         last_session_round=last_session.round_type,
         last_session_date=last_session.date.isoformat(),
         rolling_avg_score=rolling_avg,
-        personal_best_score=best_score,
+        personal_best_score=best_session.total_score,
         personal_best_round=best_session.round_type,
         personal_best_date=best_session.date.isoformat(),
         sparkline_dates=sparkline_dates,
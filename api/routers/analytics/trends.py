@@ -1,27 +1,40 @@
+from datetime import datetime
+
 import numpy as np
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import selectinload
 from sqlmodel import Session as SQLModelSession
-from sqlmodel import select
+from sqlmodel import and_, func, or_, select
 
 from api.deps import get_db
 from src import precision
-from src.models import End
+from src.models import ArrowSetup, BowSetup, End, Shot
 from src.models import Session as SessionModel
 from src.park_model import calculate_sigma_from_score, predict_score_at_distance
 
+from ._cache import cached_response
 from ._schemas import ConsistencyByRound, EquipmentComparison, ParkModelAnalysis, TrendAnalysis
-from ._shared import _parse_date
+from ._shared import SessionFilters, _filter_sessions, _shot_moment_columns, _variance_from_sums, session_filters
 
 router = APIRouter()
 
+# Per-session moment sums, reduced in SQL; inner joins skip sessions without shots.
+# Built once; requests only add filters (see _shared).
+_SESSION_MOMENTS_STATEMENT = (
+    select(SessionModel.date, SessionModel.round_type, *_shot_moment_columns())
+    .join(End, End.session_id == SessionModel.id)
+    .join(Shot, Shot.end_id == End.id)
+    .group_by(SessionModel.id)
+    .order_by(SessionModel.date)
+)
+
 
 @router.get("/park-model", response_model=ParkModelAnalysis)
+@cached_response
 def get_park_model_analysis(
     short_round_type: str = Query(..., description="Short distance round type (e.g., 'WA 18m')"),
     long_round_type: str = Query(..., description="Long distance round type (e.g., 'WA 50m')"),
-    from_date: str | None = Query(None, description="Start date filter (ISO format)"),
-    to_date: str | None = Query(None, description="End date filter (ISO format)"),
+    from_date: datetime | None = Query(None, description="Start date filter (ISO format)"),
+    to_date: datetime | None = Query(None, description="End date filter (ISO format)"),
     db: SQLModelSession = Depends(get_db),
 ):
     """
@@ -31,47 +44,35 @@ def get_park_model_analysis(
     from equipment drag loss.
     """
 
-    # Helper function to get sessions and calculate average score
-    def get_average_score_for_round(round_type: str):
-        statement = (
-            select(SessionModel)
-            .options(selectinload(SessionModel.ends).selectinload(End.shots))
-            .where(SessionModel.round_type == round_type)
+    # Both rounds' aggregates in one grouped query; outer joins keep sessions
+    # without shots in the session count. Distance/face should be consistent
+    # within a round type, so MIN just picks that value.
+    statement = _filter_sessions(
+        select(
+            SessionModel.round_type,
+            func.coalesce(func.sum(Shot.score), 0),
+            func.count(Shot.id),
+            func.count(func.distinct(SessionModel.id)),
+            func.min(SessionModel.distance_m),
+            func.min(SessionModel.target_face_size_cm),
         )
+        .outerjoin(End, End.session_id == SessionModel.id)
+        .outerjoin(Shot, Shot.end_id == End.id)
+        .where(SessionModel.round_type.in_([short_round_type, long_round_type]))
+        .group_by(SessionModel.round_type),
+        SessionFilters(from_date=from_date, to_date=to_date),
+    )
+    rounds = {row[0]: row[1:] for row in db.exec(statement)}
 
-        # Apply date filters
-        if from_date:
-            start = _parse_date(from_date)
-            statement = statement.where(SessionModel.date >= start)
-        if to_date:
-            end = _parse_date(to_date)
-            statement = statement.where(SessionModel.date <= end)
-
-        sessions = db.exec(statement).all()
-
-        if not sessions:
+    def round_stats(round_type: str):
+        if round_type not in rounds:
             return None, 0, 0, 0
-
-        total_score = 0
-        total_shots = 0
-
-        for session in sessions:
-            for end in session.ends:
-                for shot in end.shots:
-                    total_score += shot.score
-                    total_shots += 1
-
+        total_score, total_shots, session_count, distance_m, face_cm = rounds[round_type]
         avg_score = total_score / total_shots if total_shots > 0 else 0.0
+        return avg_score, session_count, distance_m, face_cm
 
-        # Get distance and face size from first session (should be consistent for same round type)
-        distance_m = sessions[0].distance_m
-        face_cm = sessions[0].target_face_size_cm
-
-        return avg_score, len(sessions), distance_m, face_cm
-
-    # Get data for both rounds
-    short_avg, short_count, short_dist, short_face = get_average_score_for_round(short_round_type)
-    long_avg, long_count, long_dist, long_face = get_average_score_for_round(long_round_type)
+    short_avg, short_count, short_dist, short_face = round_stats(short_round_type)
+    long_avg, long_count, long_dist, long_face = round_stats(long_round_type)
 
     if short_avg is None or long_avg is None:
         # Return zeros if no data
@@ -128,10 +129,9 @@ def get_park_model_analysis(
 
 
 @router.get("/trends", response_model=TrendAnalysis)
+@cached_response
 def get_trends(
-    round_type: str | None = Query(None, description="Comma-separated round types to filter"),
-    from_date: str | None = Query(None, description="Start date filter (ISO format)"),
-    to_date: str | None = Query(None, description="End date filter (ISO format)"),
+    filters: SessionFilters = Depends(session_filters),
     db: SQLModelSession = Depends(get_db),
 ):
     """
@@ -140,64 +140,30 @@ def get_trends(
     Returns per-session scores and sigmas with EWMA control charts,
     plus coefficient of variation grouped by round type.
     """
-    # Build query
-    statement = (
-        select(SessionModel)
-        .options(selectinload(SessionModel.ends).selectinload(End.shots))
-        .order_by(SessionModel.date)
-    )
-
-    # Apply filters
-    if round_type:
-        round_types = [rt.strip() for rt in round_type.split(",")]
-        statement = statement.where(SessionModel.round_type.in_(round_types))
-
-    if from_date:
-        start = _parse_date(from_date)
-        statement = statement.where(SessionModel.date >= start)
-
-    if to_date:
-        end_dt = _parse_date(to_date)
-        statement = statement.where(SessionModel.date <= end_dt)
-
-    sessions = db.exec(statement).all()
+    statement = _filter_sessions(_SESSION_MOMENTS_STATEMENT, filters)
 
     # Per-session data
     dates = []
     round_types_list = []
     scores = []
     sigmas = []
-
-    # Group by round type for consistency
-    by_round_type = {}
-
-    for session in sessions:
-        total_score = 0
-        shot_count = 0
-        xs = []
-        ys = []
-
-        for end in session.ends:
-            for shot in end.shots:
-                total_score += shot.score
-                shot_count += 1
-                xs.append(shot.x)
-                ys.append(shot.y)
-
-        if shot_count > 0:
-            avg_score = total_score / shot_count
-            # Compute sigma: sqrt(var_x + var_y)
-            sigma = float(np.sqrt(np.var(xs, ddof=0) + np.var(ys, ddof=0))) if shot_count > 1 else 0.0
-
-            dates.append(session.date.isoformat())
-            round_types_list.append(session.round_type)
-            scores.append(round(avg_score, 3))
-            sigmas.append(round(sigma, 3))
-
-            # Group for consistency
-            if session.round_type not in by_round_type:
-                by_round_type[session.round_type] = []
-            by_round_type[session.round_type].append(total_score)
+    total_scores = []
+
+    for date, session_round, shot_count, total_score, sum_x, sum_y, sum_x2, sum_y2 in db.exec(statement):
+        avg_score = total_score / shot_count
+        # Compute sigma: sqrt(var_x + var_y)
+        if shot_count > 1:
+            var_x = _variance_from_sums(shot_count, sum_x, sum_x2)
+            var_y = _variance_from_sums(shot_count, sum_y, sum_y2)
+            sigma = float(np.sqrt(var_x + var_y))
+        else:
+            sigma = 0.0
+
+        dates.append(date.isoformat())
+        round_types_list.append(session_round)
+        scores.append(round(avg_score, 3))
+        sigmas.append(round(sigma, 3))
+        total_scores.append(total_score)
 
     # Compute EWMA
     if len(scores) >= 2:
@@ -220,20 +186,19 @@ def get_trends(
             "sigma": 0.0,
         }
 
-    # Compute consistency per round type
-    consistency_list = []
-    for rt, total_scores in by_round_type.items():
-        consistency_result = precision.compute_practice_consistency(total_scores)
-        consistency_list.append(
-            ConsistencyByRound(
-                round_type=rt,
-                cv=consistency_result["cv"],
-                mean=consistency_result["mean"],
-                std=consistency_result["std"],
-                interpretation=consistency_result["interpretation"],
-                session_count=len(total_scores),
-            )
+    # Compute consistency per round type, grouped in one vectorised pass
+    by_round_type = precision.compute_grouped_consistency(np.array(round_types_list), np.array(total_scores))
+    consistency_list = [
+        ConsistencyByRound(
+            round_type=rt,
+            cv=consistency_result["cv"],
+            mean=consistency_result["mean"],
+            std=consistency_result["std"],
+            interpretation=consistency_result["interpretation"],
+            session_count=consistency_result["count"],
         )
+        for rt, consistency_result in by_round_type.items()
+    ]
 
     return TrendAnalysis(
         dates=dates,
@@ -256,9 +221,7 @@ def get_equipment_comparison(
     setup_a_arrow_id: str | None = Query(None, description="Arrow ID for setup A"),
     setup_b_bow_id: str | None = Query(None, description="Bow ID for setup B"),
     setup_b_arrow_id: str | None = Query(None, description="Arrow ID for setup B"),
-    round_type: str | None = Query(None, description="Filter to specific round type"),
-    from_date: str | None = Query(None, description="Start date filter (ISO format)"),
-    to_date: str | None = Query(None, description="End date filter (ISO format)"),
+    filters: SessionFilters = Depends(session_filters),
     db: SQLModelSession = Depends(get_db),
 ):
     """
@@ -268,73 +231,82 @@ def get_equipment_comparison(
     a significant difference between two bow/arrow configurations.
     """
 
-    def get_setup_stats(bow_id: str | None, arrow_id: str | None):
-        """Helper to get sessions and compute stats for one setup."""
-        statement = select(SessionModel).options(
-            selectinload(SessionModel.ends).selectinload(End.shots),
-            selectinload(SessionModel.bow),
-            selectinload(SessionModel.arrow),
-        )
-
-        # Filter by equipment
+    # Both setups come from one round trip: fetch every session matching
+    # either setup, then split them in Python (a session may belong to both).
+    setup_filters = []
+    for bow_id, arrow_id in ((setup_a_bow_id, setup_a_arrow_id), (setup_b_bow_id, setup_b_arrow_id)):
+        conditions = []
         if bow_id:
-            statement = statement.where(SessionModel.bow_id == bow_id)
+            conditions.append(SessionModel.bow_id == bow_id)
         if arrow_id:
-            statement = statement.where(SessionModel.arrow_id == arrow_id)
-
-        # Filter by round type
-        if round_type:
-            statement = statement.where(SessionModel.round_type == round_type)
-
-        # Apply date filters
-        if from_date:
-            start = _parse_date(from_date)
-            statement = statement.where(SessionModel.date >= start)
-        if to_date:
-            end_dt = _parse_date(to_date)
-            statement = statement.where(SessionModel.date <= end_dt)
-
-        sessions = db.exec(statement).all()
+            conditions.append(SessionModel.arrow_id == arrow_id)
+        setup_filters.append(conditions)
+
+    def filter_setups(statement):
+        if all(setup_filters):
+            statement = statement.where(or_(*(and_(*conditions) for conditions in setup_filters)))
+        return _filter_sessions(statement, filters)
+
+    # Session metadata with equipment names and per-session shot moments, all
+    # aggregated by SQLite; outer joins keep sessions without shots or equipment
+    all_sessions = db.exec(
+        filter_setups(
+            select(
+                SessionModel.id,
+                SessionModel.bow_id,
+                SessionModel.arrow_id,
+                BowSetup.name,
+                ArrowSetup.make,
+                ArrowSetup.model,
+                *_shot_moment_columns(),
+            )
+            .outerjoin(BowSetup, SessionModel.bow_id == BowSetup.id)
+            .outerjoin(ArrowSetup, SessionModel.arrow_id == ArrowSetup.id)
+            .outerjoin(End, End.session_id == SessionModel.id)
+            .outerjoin(Shot, Shot.end_id == End.id)
+            .group_by(SessionModel.id)
+        )
+    ).all()
+
+    # Per-session average score and sigma, for sessions with shots
+    session_stats = {}
+    for session_id, *_, shot_count, total_score, sum_x, sum_y, sum_x2, sum_y2 in all_sessions:
+        if shot_count == 0:
+            continue
+        sigma = 0.0
+        if shot_count > 1:
+            var_x = _variance_from_sums(shot_count, sum_x, sum_x2)
+            var_y = _variance_from_sums(shot_count, sum_y, sum_y2)
+            sigma = float(np.sqrt(var_x + var_y))
+        session_stats[session_id] = (total_score / shot_count, sigma)
 
-        # Compute per-session scores and sigmas
-        avg_scores = []
-        sigmas = []
+    def get_setup_stats(bow_id: str | None, arrow_id: str | None):
+        """Helper to compute stats for the sessions belonging to one setup."""
+        sessions = [
+            session
+            for session in all_sessions
+            if (not bow_id or session.bow_id == bow_id) and (not arrow_id or session.arrow_id == arrow_id)
+        ]
+
+        # Per-session scores and sigmas, for sessions with shots
+        setup_stats = [session_stats[session.id] for session in sessions if session.id in session_stats]
+        avg_scores = [avg_score for avg_score, _ in setup_stats]
+        sigmas = [sigma for _, sigma in setup_stats]
         name_parts = []
 
-        for session in sessions:
-            total_score = 0
-            shot_count = 0
-            xs = []
-            ys = []
-
-            for end in session.ends:
-                for shot in end.shots:
-                    total_score += shot.score
-                    shot_count += 1
-                    xs.append(shot.x)
-                    ys.append(shot.y)
-
-            if shot_count > 0:
-                avg_score = total_score / shot_count
-                avg_scores.append(avg_score)
-
-                # Compute sigma
-                sigma = float(np.sqrt(np.var(xs, ddof=0) + np.var(ys, ddof=0))) if shot_count > 1 else 0.0
-                sigmas.append(sigma)
-
         # Build name from first session (check once, not in loop)
         if sessions:
-            first_session = sessions[0]
-            if first_session.bow:
-                name_parts.append(first_session.bow.name)
-            if first_session.arrow:
-                name_parts.append(f"{first_session.arrow.make} {first_session.arrow.model}")
+            _, _, _, bow_name, arrow_make, arrow_model, *_ = sessions[0]
+            if bow_name is not None:
+                name_parts.append(bow_name)
+            if arrow_make is not None:
+                name_parts.append(f"{arrow_make} {arrow_model}")
 
         setup_name = " + ".join(name_parts) if name_parts else "Unknown Setup"
 
         return avg_scores, sigmas, setup_name, len(sessions)
 
-    # Get data for both setups
+    # Split the shared result into both setups
     a_scores, a_sigmas, a_name, a_count = get_setup_stats(setup_a_bow_id, setup_a_arrow_id)
     b_scores, b_sigmas, b_name, b_count = get_setup_stats(setup_b_bow_id, setup_b_arrow_id)
 
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import selectinload
 from sqlmodel import Session as SQLModelSession
-from sqlmodel import select
+from sqlmodel import func, select
 
 from api.deps import get_db
 from src.models import ArrowSetup, BowSetup, End, Shot
@@ -108,13 +108,26 @@ class SessionDetailResponse(BaseModel):
 @router.get("", response_model=list[SessionSummary])
 def list_sessions(bow_id: str | None = None, arrow_id: str | None = None, db: SQLModelSession = Depends(get_db)):
     """List sessions with summary stats. Optionally filter by bow_id or arrow_id."""
+    # Totals are summed in SQL over one flat join; outer joins keep sessions
+    # without shots or equipment, so no ORM graph is loaded per shot.
     statement = (
-        select(SessionModel)
-        .options(
-            selectinload(SessionModel.ends).selectinload(End.shots),
-            selectinload(SessionModel.bow),
-            selectinload(SessionModel.arrow),
+        select(
+            SessionModel.id,
+            SessionModel.date,
+            SessionModel.round_type,
+            SessionModel.distance_m,
+            SessionModel.target_face_size_cm,
+            func.coalesce(func.sum(Shot.score), 0).label("total_score"),
+            func.count(Shot.id).label("shot_count"),
+            BowSetup.name.label("bow_name"),
+            ArrowSetup.make.label("arrow_make"),
+            ArrowSetup.model.label("arrow_model"),
         )
+        .outerjoin(End, End.session_id == SessionModel.id)
+        .outerjoin(Shot, Shot.end_id == End.id)
+        .outerjoin(BowSetup, SessionModel.bow_id == BowSetup.id)
+        .outerjoin(ArrowSetup, SessionModel.arrow_id == ArrowSetup.id)
+        .group_by(SessionModel.id)
         .order_by(SessionModel.date.desc())
     )
 
@@ -124,37 +137,21 @@ def list_sessions(bow_id: str | None = None, arrow_id: str | None = None, db: SQ
     if arrow_id:
         statement = statement.where(SessionModel.arrow_id == arrow_id)
 
-    sessions = db.exec(statement).all()
-
-    # Calculate summaries
-    summaries = []
-    for session in sessions:
-        total_score = 0
-        shot_count = 0
-
-        for end in session.ends:
-            for shot in end.shots:
-                total_score += shot.score
-                shot_count += 1
-
-        avg_score = total_score / shot_count if shot_count > 0 else 0.0
-
-        summaries.append(
-            SessionSummary(
-                id=session.id,
-                date=session.date,
-                round_type=session.round_type,
-                distance_m=session.distance_m,
-                target_face_size_cm=session.target_face_size_cm,
-                total_score=total_score,
-                shot_count=shot_count,
-                avg_score=round(avg_score, 2),
-                bow_name=session.bow.name if session.bow else None,
-                arrow_name=f"{session.arrow.make} {session.arrow.model}" if session.arrow else None,
-            )
+    return [
+        SessionSummary(
+            id=row.id,
+            date=row.date,
+            round_type=row.round_type,
+            distance_m=row.distance_m,
+            target_face_size_cm=row.target_face_size_cm,
+            total_score=row.total_score,
+            shot_count=row.shot_count,
+            avg_score=round(row.total_score / row.shot_count if row.shot_count > 0 else 0.0, 2),
+            bow_name=row.bow_name,
+            arrow_name=f"{row.arrow_make} {row.arrow_model}" if row.arrow_make is not None else None,
         )
-
-    return summaries
+        for row in db.exec(statement)
+    ]
 
 
 @router.get("/{session_id}", response_model=SessionDetailResponse)
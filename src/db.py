@@ -1,25 +1,132 @@
+import math
 import os
+import threading
+from contextlib import contextmanager
+from functools import cache
 
+try:
+    import fcntl
+except ImportError:  # Windows desktop build runs a single process
+    fcntl = None
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.pool import QueuePool
 from sqlmodel import Session, SQLModel, create_engine
 
 
-def _get_db_url() -> str:
-    """Build the SQLite URL.
+def _get_db_path() -> str:
+    """Path of the SQLite database file.
 
     When BARETRACK_DATA_DIR is set (desktop / packaged mode), the database
     file is placed in that directory.  Otherwise it defaults to the current
     working directory (original behaviour for ``uvicorn api.main:app``).
     """
     data_dir = os.environ.get("BARETRACK_DATA_DIR", "")
-    db_file = os.path.join(data_dir, "baretrack.db") if data_dir else "baretrack.db"
-    return f"sqlite:///{db_file}"
+    return os.path.join(data_dir, "baretrack.db") if data_dir else "baretrack.db"
+
+
+def _get_db_url() -> str:
+    """Build the SQLite URL."""
+    return f"sqlite:///{_get_db_path()}"
+
+
+# Pooled connections keep SQLite's page cache warm between requests instead of
+# reopening the file per request.  FastAPI runs sync routes in a threadpool, so a
+# pooled connection may be checked out by a different thread than created it.
+engine = create_engine(
+    _get_db_url(),
+    poolclass=QueuePool,
+    pool_size=10,
+    max_overflow=20,
+    connect_args={"check_same_thread": False},
+)
 
 
-engine = create_engine(_get_db_url())
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply per-connection SQLite pragmas once, when the pool opens a connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-16000")  # 16 MB page cache per connection
+    cursor.close()
+
+
+# Process-wide counter bumped whenever data may have changed: on every commit.
+# Read-side caches include it in their keys so writes invalidate them.
+# Opening a connection deliberately does not bump it: the pool opens and drops
+# overflow connections under load, which would empty every cache at peak.
+_data_version = 0
+_data_version_lock = threading.Lock()
+
+
+@event.listens_for(OrmSession, "after_commit")
+def bump_data_version(*args):
+    """Mark the stored data as changed, invalidating version-keyed caches.
+
+    Runs after every ORM commit; call it directly after changing data by other
+    means, e.g. when pointing the app at a different database.
+    """
+    global _data_version
+    with _data_version_lock:
+        _data_version += 1
 
 
+def get_data_version() -> int:
+    """Current data version; changes after any commit in this process."""
+    return _data_version
+
+
+@contextmanager
+def _schema_lock():
+    """Hold an exclusive lock beside the database file while the schema is created.
+
+    Uvicorn workers each run the lifespan; the lock makes them take turns, so
+    one worker creates the tables and the rest find them already present
+    instead of racing DDL against the same file.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(_get_db_path() + ".init-lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)  # released when the file is closed
+        yield
+
+
+@cache
 def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+    """Create any missing tables and indexes.
+
+    Cached so the schema-inspection DDL pass runs at most once per process, no
+    matter how many times the app lifespan (or a test client) starts up.
+    ``create_all`` only creates indexes alongside new tables, so indexes added
+    later are created separately for databases made by older versions.
+    """
+    with _schema_lock():
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as connection:
+            for table in SQLModel.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(connection, checkfirst=True)
+            if "shot" in SQLModel.metadata.tables:
+                _upgrade_shot_radius(connection)
+
+
+def _upgrade_shot_radius(connection):
+    """Add and backfill ``shot.radius_cm`` on databases created before it existed.
+
+    New rows get the radius from the model's save hook; this only fills rows
+    written by older versions, so after the first run it finds nothing to do.
+    """
+    if "radius_cm" not in {column["name"] for column in inspect(connection).get_columns("shot")}:
+        connection.execute(text("ALTER TABLE shot ADD COLUMN radius_cm FLOAT"))
+    rows = connection.execute(text("SELECT id, x, y FROM shot WHERE radius_cm IS NULL")).all()
+    if rows:
+        connection.execute(
+            text("UPDATE shot SET radius_cm = :radius WHERE id = :id"),
+            [{"id": shot_id, "radius": math.hypot(x, y)} for shot_id, x, y in rows],
+        )
 
 
 def get_session():
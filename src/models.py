@@ -1,7 +1,9 @@
+import math
 import uuid
 from datetime import datetime
 from enum import Enum
 
+from sqlalchemy import Index, event
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -125,6 +127,9 @@ class TabSetup(SQLModel, table=True):
 
 
 class Session(SQLModel, table=True):
+    # Analytics filter on round type and date range
+    __table_args__ = (Index("ix_session_round_type_date", "round_type", "date"),)
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     date: datetime = Field(default_factory=datetime.now)
 
@@ -145,6 +150,9 @@ class Session(SQLModel, table=True):
 
 
 class End(SQLModel, table=True):
+    # Also serves per-session lookups ordered by end number
+    __table_args__ = (Index("ix_end_session_id_end_number", "session_id", "end_number"),)
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     session_id: str = Field(foreign_key="session.id")
     end_number: int
@@ -155,6 +163,8 @@ class End(SQLModel, table=True):
 
 
 class Shot(SQLModel, table=True):
+    __table_args__ = (Index("ix_shot_end_id", "end_id"),)
+
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
     end_id: str = Field(foreign_key="end.id")
 
@@ -167,11 +177,21 @@ class Shot(SQLModel, table=True):
 
     arrow_number: int | None = Field(default=None, description="The number marked on the arrow shaft")
     shot_sequence: int | None = Field(default=None, description="Deterministic shot order within end (0-indexed)")
+    radius_cm: float | None = Field(
+        default=None, description="Distance from the target centre, derived from x/y on save"
+    )
 
     # Relationships
     end: End = Relationship(back_populates="shots")
 
 
+@event.listens_for(Shot, "before_insert")
+@event.listens_for(Shot, "before_update")
+def _set_shot_radius(mapper, connection, target: Shot):
+    """Keep the stored radius in step with the coordinates."""
+    target.radius_cm = math.hypot(target.x, target.y)
+
+
 # Compatibility Classes for Pydantic-only usage (if needed)
 # We can remove the old classes or alias them if the rest of the app depends on them heavily.
 # For now, I'm replacing the file content entirely with the SQLModel versions.
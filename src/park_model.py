@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 
 # Constants for Target Faces (Radius in cm)
 # WA Target Faces: 122cm, 80cm, 60cm, 40cm
@@ -107,6 +109,74 @@ def predict_score_at_distance(
     return predicted_score, sigma_new
 
 
+def _expected_scores(sigma_r: np.ndarray, face_diameter_cm: np.ndarray) -> np.ndarray:
+    """Vectorised ``calculate_expected_score`` over arrays of sigma and face size."""
+    # Ring outer radii as a trailing axis: shape (..., 10)
+    radii = (face_diameter_cm / 20.0)[..., np.newaxis] * np.arange(1, 11)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        two_sigma_sq = 2 * sigma_r[..., np.newaxis] ** 2
+        score_loss = np.exp(-(radii**2) / two_sigma_sq).sum(axis=-1)
+    return np.where(sigma_r <= 0, 10.0, 10.0 - score_loss)
+
+
+def _sigmas_from_scores(score: np.ndarray, face_diameter_cm: np.ndarray, tolerance: float = 0.001) -> np.ndarray:
+    """
+    Vectorised ``calculate_sigma_from_score``.
+
+    Runs the same binary search on every element at once, freezing each element
+    as soon as it lands within tolerance so results match the scalar version.
+    """
+    low = np.zeros_like(score)
+    high = np.full_like(score, 200.0)
+    result = np.zeros_like(score)
+    done = (score >= 10) | (score <= 0)
+    result[score <= 0] = 1000.0
+
+    for _ in range(50):
+        if done.all():
+            break
+        mid = (low + high) / 2
+        predicted = _expected_scores(mid, face_diameter_cm)
+
+        converged = ~done & (np.abs(predicted - score) < tolerance)
+        result[converged] = mid[converged]
+        done |= converged
+
+        too_good = predicted > score
+        low = np.where(~done & too_good, mid, low)
+        high = np.where(~done & ~too_good, mid, high)
+
+    return np.where(done, result, (low + high) / 2)
+
+
+def predict_score_batch(
+    known_score, known_distance_m, known_face_cm, target_distance_m, target_face_cm
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Array version of ``predict_score_at_distance`` for distance/face sweeps.
+
+    Inputs broadcast against each other, so a single known score can be
+    projected onto many target distances in one call.
+    Returns (Predicted Scores, Predicted Sigma_R values) as float arrays.
+    """
+    known_score, known_distance_m, known_face_cm, target_distance_m, target_face_cm = np.broadcast_arrays(
+        *(
+            np.asarray(a, dtype=float)
+            for a in (known_score, known_distance_m, known_face_cm, target_distance_m, target_face_cm)
+        )
+    )
+
+    sigma_known = _sigmas_from_scores(known_score, known_face_cm)
+
+    valid = known_distance_m > 0
+    safe_known_distance = np.where(valid, known_distance_m, 1.0)
+    sigma_new = sigma_known / (safe_known_distance * 100.0) * (target_distance_m * 100.0)
+    predicted_score = _expected_scores(sigma_new, target_face_cm)
+
+    # Guard against zero distance (e.g. Flint multi-distance rounds), as in the scalar version
+    return np.where(valid, predicted_score, 0.0), np.where(valid, sigma_new, 0.0)
+
+
 def calculate_drag_loss(
     short_score: float,
     short_dist_m: float,
@@ -1,3 +1,5 @@
+import numpy as np
+
 from src.models import ArrowSetup, BowSetup
 
 
@@ -65,17 +67,73 @@ def calculate_foc(
     return round(foc_decimal * 100.0, 1)
 
 
+# Setup rules are stored column-wise: each metric is split into bands by
+# ascending edges (``searchsorted(side="right")``), with a parallel penalty and
+# feedback template per band. Strict ">" limits use the next float above the
+# threshold so a value exactly on the limit stays in the lower band.
+_SAFETY_GPP_EDGES = np.array([5.0, 7.0])
+_SAFETY_GPP_MESSAGES = np.array(
+    [
+        "CRITICAL: GPP is below 5.0. Risk of limb failure (Dry Fire equivalent).",
+        "WARNING: GPP is below 7.0. Check limb manufacturer warranty.",
+        None,
+    ],
+    dtype=object,
+)
+
+_EFFICIENCY_RULES = {
+    # Indoor wants heavy arrows (High GPP) for stability
+    "indoor": (
+        (
+            "gpp",
+            np.array([8.0, np.nextafter(13.0, np.inf)]),
+            np.array([30, 0, 10]),
+            np.array(
+                [
+                    "GPP ({gpp:.1f}) is too low for Indoor. Consider heavier points to slow the shot and reduce gaps.",
+                    "Excellent GPP for Indoor stability.",
+                    "GPP ({gpp:.1f}) is very high. Ensure trajectory allows reaching 18m with good sight mark.",
+                ],
+                dtype=object,
+            ),
+        ),
+        (
+            "shaft_diameter_mm",
+            np.array([8.0]),
+            np.array([10, 0]),
+            np.array(["Arrow is thin for Indoor. Consider 9.3mm shafts for line-cutting.", None], dtype=object),
+        ),
+    ),
+    # Outdoor wants speed (Low GPP) and low drag; low GPP is a safety risk too
+    "outdoor": (
+        (
+            "gpp",
+            np.array([6.0, np.nextafter(9.0, np.inf)]),
+            np.array([30, 0, 20]),
+            np.array(
+                [
+                    "GPP is critically low.",
+                    None,
+                    "GPP ({gpp:.1f}) is heavy for Outdoor. You may struggle with 50m sight marks.",
+                ],
+                dtype=object,
+            ),
+        ),
+        (
+            "shaft_diameter_mm",
+            np.array([np.nextafter(6.0, np.inf)]),
+            np.array([0, 15]),
+            np.array([None, "Arrow diameter is large for Outdoor. Wind drift will be significant."], dtype=object),
+        ),
+    ),
+}
+
+
 def analyze_setup_safety(bow: BowSetup, arrow: ArrowSetup) -> list[str]:
     """Checks for dangerous configurations."""
-    warnings = []
     gpp = calculate_gpp(arrow.total_arrow_weight_gr, bow.draw_weight_otf)
-
-    if gpp < 5.0:
-        warnings.append("CRITICAL: GPP is below 5.0. Risk of limb failure (Dry Fire equivalent).")
-    elif gpp < 7.0:
-        warnings.append("WARNING: GPP is below 7.0. Check limb manufacturer warranty.")
-
-    return warnings
+    message = _SAFETY_GPP_MESSAGES[np.searchsorted(_SAFETY_GPP_EDGES, gpp, side="right")]
+    return [message] if message else []
 
 
 def score_setup_efficiency(bow: BowSetup, arrow: ArrowSetup, discipline: str = "indoor") -> dict:
@@ -87,37 +145,12 @@ def score_setup_efficiency(bow: BowSetup, arrow: ArrowSetup, discipline: str = "
     feedback = []
 
     gpp = calculate_gpp(arrow.total_arrow_weight_gr, bow.draw_weight_otf)
+    values = {"gpp": gpp, "shaft_diameter_mm": arrow.shaft_diameter_mm}
 
-    if discipline == "indoor":
-        # Indoor wants heavy arrows (High GPP) for stability
-        if gpp < 8.0:
-            score -= 30
-            feedback.append(
-                f"GPP ({gpp:.1f}) is too low for Indoor. Consider heavier points to slow the shot and reduce gaps."
-            )
-        elif gpp > 13.0:
-            score -= 10
-            feedback.append(
-                f"GPP ({gpp:.1f}) is very high. Ensure trajectory allows reaching 18m with good sight mark."
-            )
-        else:
-            feedback.append("Excellent GPP for Indoor stability.")
-
-        if arrow.shaft_diameter_mm < 8.0:
-            score -= 10
-            feedback.append("Arrow is thin for Indoor. Consider 9.3mm shafts for line-cutting.")
-
-    elif discipline == "outdoor":
-        # Outdoor wants speed (Low GPP) and low drag
-        if gpp > 9.0:
-            score -= 20
-            feedback.append(f"GPP ({gpp:.1f}) is heavy for Outdoor. You may struggle with 50m sight marks.")
-        elif gpp < 6.0:
-            score -= 30  # Safety risk handled elsewhere, but bad for stability too
-            feedback.append("GPP is critically low.")
-
-        if arrow.shaft_diameter_mm > 6.0:
-            score -= 15
-            feedback.append("Arrow diameter is large for Outdoor. Wind drift will be significant.")
+    for metric, edges, penalties, messages in _EFFICIENCY_RULES.get(discipline, ()):
+        band = np.searchsorted(edges, values[metric], side="right")
+        score -= int(penalties[band])
+        if messages[band]:
+            feedback.append(messages[band].format(gpp=gpp))
 
     return {"score": max(0, score), "gpp": round(gpp, 2), "feedback": feedback}
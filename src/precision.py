@@ -1,9 +1,38 @@
 """Advanced precision and statistical metrics for archery shot analysis."""
 
 import math
+from functools import lru_cache
 
 import numpy as np
+from scipy import signal as scipy_signal
 from scipy import stats as scipy_stats
+from scipy.spatial.distance import pdist
+
+# Optional robust covariance; resolved once here rather than retried per call
+try:
+    from sklearn.covariance import MinCovDet
+except ImportError:
+    MinCovDet = None
+
+# Chi-squared 97.5% quantile with 2 dof (~7.38), the flier cut-off
+_FLIER_CHI2_THRESHOLD = float(scipy_stats.chi2.ppf(0.975, 2))
+
+
+def _percentile(values: np.ndarray, q: float) -> float:
+    """
+    Linear-interpolated percentile, as ``np.percentile``, via quickselect.
+
+    ``np.partition`` places just the two bracketing order statistics in O(n)
+    instead of sorting the whole array.
+    """
+    n = len(values)
+    if n == 0:
+        return 0.0
+    rank = q / 100.0 * (n - 1)
+    lo = int(rank)
+    hi = min(lo + 1, n - 1)
+    part = np.partition(values, (lo, hi))
+    return float(part[lo] + (part[hi] - part[lo]) * (rank - lo))
 
 
 def compute_drms(xs: np.ndarray, ys: np.ndarray) -> float:
@@ -13,23 +42,115 @@ def compute_drms(xs: np.ndarray, ys: np.ndarray) -> float:
     return float(np.sqrt(var_x + var_y))
 
 
+def compute_group_stats(xs: np.ndarray, ys: np.ndarray) -> dict:
+    """
+    Core group statistics from one stacked (2, n) coordinate buffer.
+
+    Returns:
+        mpi_x, mpi_y: mean point of impact
+        sigma_x, sigma_y: per-axis population standard deviation
+        mean_radius: mean distance from the target centre
+        cep_50: median distance from the target centre
+    """
+    xy = np.vstack((xs, ys)).astype(float, copy=False)
+    if xy.shape[1] == 0:
+        return dict.fromkeys(("mpi_x", "mpi_y", "sigma_x", "sigma_y", "mean_radius", "cep_50"), 0.0)
+
+    mpi = xy.mean(axis=1)
+    sigma = np.sqrt(np.square(xy - mpi[:, None]).mean(axis=1))
+    radii = np.hypot(xy[0], xy[1])
+
+    return {
+        "mpi_x": float(mpi[0]),
+        "mpi_y": float(mpi[1]),
+        "sigma_x": float(sigma[0]),
+        "sigma_y": float(sigma[1]),
+        "mean_radius": float(radii.mean()),
+        "cep_50": _percentile(radii, 50),
+    }
+
+
+def compute_group_stats_by_group(
+    groups: np.ndarray, xs: np.ndarray, ys: np.ndarray, radii: np.ndarray | None = None
+) -> dict:
+    """
+    ``compute_group_stats`` for many groups of shots in one vectorised pass.
+
+    ``groups`` gives each shot's group index (every index up to the largest
+    must occur). Returns the same keys, each an array indexed by group: one
+    ``np.bincount`` per statistic, and one sort for all the medians.
+    ``radii`` (distance from the centre) may be passed if already known, e.g.
+    the stored ``Shot.radius_cm``; otherwise it is computed from xs/ys.
+    """
+    if len(groups) == 0:
+        return {key: np.zeros(0) for key in ("mpi_x", "mpi_y", "sigma_x", "sigma_y", "mean_radius", "cep_50")}
+
+    xy = np.vstack((xs, ys)).astype(float)
+    counts = np.bincount(groups)
+
+    def group_means(values):
+        return np.bincount(groups, weights=values) / counts
+
+    mpi_x, mpi_y = group_means(xy[0]), group_means(xy[1])
+    radii = np.hypot(xy[0], xy[1]) if radii is None else np.asarray(radii, dtype=float)
+
+    # Sort radii within each group, then pick the middle element(s) of each run;
+    # even counts average the middle pair, as np.percentile(r, 50) does. Sorting
+    # by radius, then stably by group id, is about twice as fast as np.lexsort and
+    # no slower than a quickselect (np.partition) per group.
+    by_radius = np.argsort(radii)
+    sorted_radii = radii[by_radius[np.argsort(groups[by_radius], kind="stable")]]
+    starts = np.cumsum(counts) - counts
+    medians = (sorted_radii[starts + (counts - 1) // 2] + sorted_radii[starts + counts // 2]) / 2
+
+    return {
+        "mpi_x": mpi_x,
+        "mpi_y": mpi_y,
+        "sigma_x": np.sqrt(group_means(np.square(xy[0] - mpi_x[groups]))),
+        "sigma_y": np.sqrt(group_means(np.square(xy[1] - mpi_y[groups]))),
+        "mean_radius": group_means(radii),
+        "cep_50": medians,
+    }
+
+
+# Eight-point compass, indexed by bearing in 45° steps counter-clockwise from East
+_COMPASS_POINTS = np.array(["E", "NE", "N", "NW", "W", "SW", "S", "SE"])
+
+
+def compass_direction(dx: float | np.ndarray, dy: float | np.ndarray) -> np.ndarray:
+    """
+    Eight-way compass direction of an offset (or array of offsets) from centre.
+
+    The bearing is snapped to the nearest 45° step and wrapped with a bitmask
+    (``& 7``), so arrays of offsets classify in one vectorised pass.
+    """
+    # atan2(y, x) gives angle where 0=East, pi/2=North
+    steps = np.round(np.arctan2(dy, dx) / (np.pi / 4)).astype(np.int64)
+    return _COMPASS_POINTS[steps & 7]
+
+
 def compute_r95(xs: np.ndarray, ys: np.ndarray) -> float:
     """95th percentile radial error. Empirical percentile of radial distances."""
     cx, cy = np.mean(xs), np.mean(ys)
     radii = np.sqrt((xs - cx) ** 2 + (ys - cy) ** 2)
-    return float(np.percentile(radii, 95))
+    return _percentile(radii, 95)
 
 
 def compute_extreme_spread(xs: np.ndarray, ys: np.ndarray) -> float:
     """Maximum pairwise distance between any two shots."""
-    from scipy.spatial.distance import pdist
-
     if len(xs) < 2:
         return 0.0
     points = np.column_stack([xs, ys])
     return float(np.max(pdist(points)))
 
 
+@lru_cache(maxsize=256)
+def _chi2_interval(dof: int, confidence: float) -> tuple[float, float]:
+    """Two-sided χ² quantiles; memoised since shot counts repeat between requests."""
+    alpha = 1 - confidence
+    return float(scipy_stats.chi2.ppf(alpha / 2, dof)), float(scipy_stats.chi2.ppf(1 - alpha / 2, dof))
+
+
 def compute_rayleigh_sigma_with_ci(xs: np.ndarray, ys: np.ndarray, confidence: float = 0.95) -> dict:
     """
     Rayleigh scale parameter σ_r with χ² confidence interval.
@@ -49,9 +170,7 @@ def compute_rayleigh_sigma_with_ci(xs: np.ndarray, ys: np.ndarray, confidence: f
 
     # CI via χ²(2n) distribution
     # 2n * σ² / σ_true² ~ χ²(2n)
-    alpha = 1 - confidence
-    chi2_lower = scipy_stats.chi2.ppf(alpha / 2, 2 * n)
-    chi2_upper = scipy_stats.chi2.ppf(1 - alpha / 2, 2 * n)
+    chi2_lower, chi2_upper = _chi2_interval(2 * n, confidence)
 
     ci_lower = sigma * math.sqrt(2 * n / chi2_upper)
     ci_upper = sigma * math.sqrt(2 * n / chi2_lower)
@@ -140,23 +259,77 @@ def compute_practice_consistency(scores: list[float]) -> dict:
 
     cv = (std_val / mean_val) * 100
 
-    if cv < 3:
-        interp = "Excellent consistency — very reproducible"
-    elif cv < 6:
-        interp = "Good consistency"
-    elif cv < 10:
-        interp = "Moderate variability"
-    else:
-        interp = "High variability — performance fluctuates significantly"
-
     return {
         "cv": round(cv, 2),
         "mean": round(mean_val, 2),
         "std": round(std_val, 2),
-        "interpretation": interp,
+        "interpretation": _consistency_interpretation(cv),
     }
 
 
+def _consistency_interpretation(cv: float) -> str:
+    if cv < 3:
+        return "Excellent consistency — very reproducible"
+    if cv < 6:
+        return "Good consistency"
+    if cv < 10:
+        return "Moderate variability"
+    return "High variability — performance fluctuates significantly"
+
+
+def compute_grouped_consistency(groups: np.ndarray, scores: np.ndarray) -> dict:
+    """
+    ``compute_practice_consistency`` for every group of a flat score array.
+
+    Per-group count, sum and sum of squares come from ``np.bincount`` in one
+    vectorised pass instead of a list per group.
+
+    Returns:
+        {group: result} in order of first appearance; each result has the
+        ``compute_practice_consistency`` keys plus ``count``
+    """
+    scores = np.asarray(scores, dtype=float)
+    labels, first_index, inverse = np.unique(groups, return_index=True, return_inverse=True)
+    counts = np.bincount(inverse)
+    sums = np.bincount(inverse, weights=scores)
+    sums_sq = np.bincount(inverse, weights=scores * scores)
+
+    results = {}
+    for i in np.argsort(first_index, kind="stable"):
+        n = int(counts[i])
+        mean_val = float(sums[i] / n)
+        if n < 2:
+            result = {"cv": 0.0, "mean": mean_val, "std": 0.0, "interpretation": "Need more sessions"}
+        elif mean_val < 0.001:
+            result = {"cv": 0.0, "mean": 0.0, "std": 0.0, "interpretation": "No data"}
+        else:
+            # Sample (ddof=1) standard deviation from the moment sums
+            std_val = math.sqrt(max(sums_sq[i] - sums[i] * mean_val, 0.0) / (n - 1))
+            cv = (std_val / mean_val) * 100
+            result = {
+                "cv": round(cv, 2),
+                "mean": round(mean_val, 2),
+                "std": round(std_val, 2),
+                "interpretation": _consistency_interpretation(cv),
+            }
+        results[labels[i].item()] = {**result, "count": n}
+    return results
+
+
+def compute_ewma_series(values: np.ndarray, lam: float, initial: float) -> np.ndarray:
+    """
+    EWMA recurrence ``e[t] = lam * x[t] + (1 - lam) * e[t-1]`` with ``e[-1] = initial``.
+
+    Evaluated as a first-order IIR filter (``scipy.signal.lfilter``), so the
+    loop runs in C rather than Python.
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return values
+    smoothed, _ = scipy_signal.lfilter([lam], [1.0, lam - 1.0], values, zi=[(1.0 - lam) * initial])
+    return smoothed
+
+
 def compute_ewma(values: list[float], lam: float = 0.2) -> dict:
     """
     Exponentially Weighted Moving Average with control limits.
@@ -181,18 +354,14 @@ def compute_ewma(values: list[float], lam: float = 0.2) -> dict:
 
     L = 2.7  # control limit multiplier (≈ 3σ equivalent)
 
-    ewma_vals = []
-    ucl_vals = []
-    lcl_vals = []
+    ewma = compute_ewma_series(arr, lam, mu)  # start at overall mean
+    # Time-varying control limits
+    steps = np.arange(1, len(arr) + 1)
+    factor = sigma * np.sqrt(lam / (2 - lam) * (1 - (1 - lam) ** (2 * steps)))
 
-    ewma_t = mu  # start at overall mean
-    for i, x in enumerate(arr):
-        ewma_t = lam * x + (1 - lam) * ewma_t
-        # Time-varying control limits
-        factor = sigma * math.sqrt(lam / (2 - lam) * (1 - (1 - lam) ** (2 * (i + 1))))
-        ewma_vals.append(round(ewma_t, 4))
-        ucl_vals.append(round(mu + L * factor, 4))
-        lcl_vals.append(round(mu - L * factor, 4))
+    ewma_vals = [round(v, 4) for v in ewma.tolist()]
+    ucl_vals = [round(v, 4) for v in (mu + L * factor).tolist()]
+    lcl_vals = [round(v, 4) for v in (mu - L * factor).tolist()]
 
     return {
         "ewma": ewma_vals,
@@ -203,7 +372,7 @@ def compute_ewma(values: list[float], lam: float = 0.2) -> dict:
     }
 
 
-def compute_within_end_trend(shots_by_position: dict[int, list[float]]) -> dict:
+def compute_within_end_trend(shots_by_position: dict[int, list[float] | np.ndarray]) -> dict:
     """
     Score as function of shot position within an end.
 
@@ -257,6 +426,31 @@ def compute_within_end_trend(shots_by_position: dict[int, list[float]]) -> dict:
     }
 
 
+def compute_linear_trend(xs: np.ndarray, ys: np.ndarray) -> dict:
+    """
+    Least-squares slope and Pearson correlation of ys against xs.
+
+    Both come from the same centred sums (Sxx, Syy, Sxy), so this matches
+    ``np.polyfit(xs, ys, 1)[0]`` and ``np.corrcoef(xs, ys)[0, 1]`` without
+    either call's overhead.
+
+    Returns:
+        slope: change in y per unit x (0.0 if xs has no spread)
+        correlation: Pearson r (0.0 if either series has no spread)
+    """
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    dx = xs - xs.mean()
+    dy = ys - ys.mean()
+    sxx = float(dx @ dx)
+    syy = float(dy @ dy)
+    sxy = float(dx @ dy)
+
+    slope = sxy / sxx if sxx > 0 else 0.0
+    correlation = sxy / math.sqrt(sxx * syy) if sxx > 0 and syy > 0 else 0.0
+    return {"slope": slope, "correlation": correlation}
+
+
 def compute_confidence_ellipse(xs: np.ndarray, ys: np.ndarray, coverage: float = 0.9) -> dict:
     """
     Confidence ellipse from 2x2 covariance matrix eigendecomposition.
@@ -281,26 +475,31 @@ def compute_confidence_ellipse(xs: np.ndarray, ys: np.ndarray, coverage: float =
         }
 
     cx, cy = float(np.mean(xs)), float(np.mean(ys))
-    cov = np.cov(xs, ys)  # 2x2 covariance matrix
-    eigenvalues, eigenvectors = np.linalg.eigh(cov)
+    dx = xs - cx
+    dy = ys - cy
+    n = len(xs)
+    # 2x2 sample covariance matrix [[sxx, sxy], [sxy, syy]]
+    sxx = float(dx @ dx) / (n - 1)
+    syy = float(dy @ dy) / (n - 1)
+    sxy = float(dx @ dy) / (n - 1)
 
-    # Sort by eigenvalue descending
-    order = eigenvalues.argsort()[::-1]
-    eigenvalues = eigenvalues[order]
-    eigenvectors = eigenvectors[:, order]
+    # Closed-form eigenvalues of the symmetric 2x2 matrix, largest first
+    half_trace = (sxx + syy) / 2
+    half_gap = math.hypot((sxx - syy) / 2, sxy)
+    major_var = half_trace + half_gap
+    minor_var = half_trace - half_gap
 
-    # Scale factor for coverage probability (chi2 with 2 dof)
-    chi2_val = scipy_stats.chi2.ppf(coverage, 2)
+    # Scale factor for coverage probability: chi2 with 2 dof has ppf(p) = -2 ln(1 - p)
+    chi2_val = -2.0 * math.log1p(-coverage)
 
-    semi_major = math.sqrt(eigenvalues[0] * chi2_val)
-    semi_minor = math.sqrt(max(eigenvalues[1], 0) * chi2_val)
+    semi_major = math.sqrt(major_var * chi2_val)
+    semi_minor = math.sqrt(max(minor_var, 0) * chi2_val)
 
-    # Angle of major axis
-    angle_rad = math.atan2(eigenvectors[1, 0], eigenvectors[0, 0])
-    angle_deg = math.degrees(angle_rad)
+    # Angle of major axis, in (-90, 90] (the ellipse is symmetric under 180° rotation)
+    angle_deg = math.degrees(0.5 * math.atan2(2 * sxy, sxx - syy))
 
     # Correlation
-    corr = float(np.corrcoef(xs, ys)[0, 1]) if np.std(xs) > 0 and np.std(ys) > 0 else 0.0
+    corr = sxy / math.sqrt(sxx * syy) if sxx > 0 and syy > 0 else 0.0
 
     return {
         "center_x": round(cx, 3),
@@ -342,12 +541,15 @@ def detect_fliers(xs: np.ndarray, ys: np.ndarray, threshold_sigma: float = 2.5)
     mean = np.mean(points, axis=0)
 
     # Try robust covariance first
-    try:
-        from sklearn.covariance import MinCovDet
+    mahal_dist = None
+    if MinCovDet is not None:
+        try:
+            mcd = MinCovDet().fit(points)
+            mahal_dist = mcd.mahalanobis(points)
+        except ValueError:
+            pass
 
-        mcd = MinCovDet().fit(points)
-        mahal_dist = mcd.mahalanobis(points)
-    except (ImportError, ValueError):
+    if mahal_dist is None:
         # Fallback to standard Mahalanobis
         cov = np.cov(xs, ys)
         try:
@@ -365,10 +567,7 @@ def detect_fliers(xs: np.ndarray, ys: np.ndarray, threshold_sigma: float = 2.5)
                 "interpretation": "Cannot compute — singular covariance",
             }
 
-    # Chi-squared threshold with 2 dof
-    chi2_threshold = scipy_stats.chi2.ppf(0.975, 2)  # ~7.38
-
-    flier_mask = mahal_dist > chi2_threshold
+    flier_mask = mahal_dist > _FLIER_CHI2_THRESHOLD
     flier_indices = list(np.where(flier_mask)[0])
 
     full_drms = compute_drms(xs, ys)
@@ -534,6 +733,10 @@ def compute_equipment_comparison(
     """
     Statistical comparison of two equipment setups using Welch's t-test.
 
+    Each setup's sigmas are per-session group sizes. They usually parallel its
+    scores but may be fewer (sessions without a group); the sigma test needs
+    at least two per setup, otherwise its p-value is 1.0.
+
     Returns:
         score_diff: mean score difference (A - B)
         score_p_value: p-value for score difference
@@ -556,27 +759,29 @@ def compute_equipment_comparison(
             "interpretation": "Need ≥2 sessions with each setup for comparison",
         }
 
-    a_scores = np.array(setup_a_scores)
-    b_scores = np.array(setup_b_scores)
-
-    # Welch's t-test on scores
-    t_stat, p_score = scipy_stats.ttest_ind(a_scores, b_scores, equal_var=False)
-    score_diff = float(np.mean(a_scores) - np.mean(b_scores))
+    a_scores, a_sigmas = np.asarray(setup_a_scores, dtype=np.float64), np.asarray(setup_a_sigmas, dtype=np.float64)
+    b_scores, b_sigmas = np.asarray(setup_b_scores, dtype=np.float64), np.asarray(setup_b_sigmas, dtype=np.float64)
+    if len(a_scores) == len(a_sigmas) and len(b_scores) == len(b_sigmas):
+        # Rows are (scores, sigmas) per session, so one batched Welch's t-test
+        # along axis 1 covers both comparisons
+        _, (p_score, p_sigma) = scipy_stats.ttest_ind(
+            np.vstack((a_scores, a_sigmas)), np.vstack((b_scores, b_sigmas)), axis=1, equal_var=False
+        )
+    else:
+        # Sigmas not parallel to scores (e.g. some sessions lack a group): test separately
+        p_score = scipy_stats.ttest_ind(a_scores, b_scores, equal_var=False).pvalue
+        p_sigma = (
+            scipy_stats.ttest_ind(a_sigmas, b_sigmas, equal_var=False).pvalue
+            if len(a_sigmas) >= 2 and len(b_sigmas) >= 2
+            else 1.0
+        )
+    score_diff = float(a_scores.mean() - b_scores.mean())
+    sigma_diff = float(a_sigmas.mean() - b_sigmas.mean()) if len(a_sigmas) and len(b_sigmas) else 0.0
 
     # Cohen's d
     pooled_std = math.sqrt((np.var(a_scores, ddof=1) + np.var(b_scores, ddof=1)) / 2)
     cohens_d = score_diff / pooled_std if pooled_std > 0.001 else 0.0
 
-    # Sigma comparison
-    a_sig = np.array(setup_a_sigmas)
-    b_sig = np.array(setup_b_sigmas)
-    _, p_sigma = (
-        scipy_stats.ttest_ind(a_sig, b_sig, equal_var=False)
-        if len(setup_a_sigmas) >= 2 and len(setup_b_sigmas) >= 2
-        else (0, 1.0)
-    )
-    sigma_diff = float(np.mean(a_sig) - np.mean(b_sig))
-
     score_sig = bool(p_score < 0.05)
     sigma_sig = bool(p_sigma < 0.05)
 
@@ -259,6 +259,13 @@ _ROUND_PRESETS: dict[str, RoundPreset] = {
 }
 
 
+# Case-folded index so lookups are a single dict hit rather than a registry scan
+# (built in reverse so the first registry entry wins, as the scan did)
+_ROUND_PRESETS_BY_LOWER_NAME: dict[str, RoundPreset] = {
+    key.lower(): preset for key, preset in reversed(_ROUND_PRESETS.items())
+}
+
+
 def get_round_preset(name: str) -> RoundPreset | None:
     """
     Lookup a round preset by name (case-insensitive).
@@ -269,11 +276,7 @@ def get_round_preset(name: str) -> RoundPreset | None:
     Returns:
         RoundPreset if found, None otherwise
     """
-    # Case-insensitive lookup
-    for key, preset in _ROUND_PRESETS.items():
-        if key.lower() == name.lower():
-            return preset
-    return None
+    return _ROUND_PRESETS_BY_LOWER_NAME.get(name.lower())
 
 
 def get_all_presets() -> list[RoundPreset]:
@@ -23,6 +23,10 @@ def client_fixture():
 
     from api.deps import get_db
     from api.main import app
+    from src.db import bump_data_version
+
+    # A fresh database: responses cached for the previous test's data must not be served
+    bump_data_version()
 
     def get_db_override():
         with SQLModelSession(test_engine) as session:
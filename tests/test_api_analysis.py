@@ -63,6 +63,62 @@ def test_predict_score(client: TestClient):
     assert "predicted_sigma" in data
 
 
+def test_predict_score_batch(client: TestClient):
+    payload = {
+        "known_score": 9.0,
+        "known_distance_m": 18,
+        "known_face_cm": 40,
+        "target_distances_m": [30, 50],
+        "target_faces_cm": [80, 122],
+    }
+    response = client.post("/api/analysis/predict-score/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["predicted_scores"]) == 2
+    assert len(data["predicted_sigmas"]) == 2
+
+    # Each element matches the single-target endpoint
+    single = client.post(
+        "/api/analysis/predict-score",
+        json={
+            "known_score": 9.0,
+            "known_distance_m": 18,
+            "known_face_cm": 40,
+            "target_distance_m": 50,
+            "target_face_cm": 122,
+        },
+    ).json()
+    assert data["predicted_scores"][1] == single["predicted_score"]
+    assert data["predicted_sigmas"][1] == single["predicted_sigma"]
+
+
+def test_predict_score_batch_length_mismatch(client: TestClient):
+    payload = {
+        "known_score": 9.0,
+        "known_distance_m": 18,
+        "known_face_cm": 40,
+        "target_distances_m": [30, 50],
+        "target_faces_cm": [80],
+    }
+    response = client.post("/api/analysis/predict-score/batch", json=payload)
+    assert response.status_code == 422
+
+
+def test_predict_score_batch_size_limit(client: TestClient):
+    from api.routers.analysis import MAX_BATCH_TARGETS
+
+    payload = {
+        "known_score": 9.0,
+        "known_distance_m": 18,
+        "known_face_cm": 40,
+        "target_distances_m": [30.0] * (MAX_BATCH_TARGETS + 1),
+        "target_faces_cm": [80] * (MAX_BATCH_TARGETS + 1),
+    }
+    response = client.post("/api/analysis/predict-score/batch", json=payload)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "target_distances_m"]
+
+
 def test_virtual_coach(client: TestClient):
     bow_id, arrow_id = _create_equipment(client)
 
@@ -82,6 +138,28 @@ def test_virtual_coach(client: TestClient):
     assert response.status_code == 200
 
 
+def test_virtual_coach_reflects_equipment_updates(client: TestClient):
+    bow_id, arrow_id = _create_equipment(client)
+    payload = {
+        "bow_id": bow_id,
+        "arrow_id": arrow_id,
+        "short_score": 9.0,
+        "short_distance_m": 18,
+        "short_face_cm": 40,
+        "long_score": 7.5,
+        "long_distance_m": 50,
+        "long_face_cm": 122,
+    }
+    first = client.post("/api/analysis/virtual-coach", json=payload).json()
+    assert client.post("/api/analysis/virtual-coach", json=payload).json() == first
+
+    # Changing the arrow weight must not serve the cached analysis
+    client.put(f"/api/arrows/{arrow_id}", json={"total_arrow_weight_gr": 150})
+    updated = client.post("/api/analysis/virtual-coach", json=payload).json()
+    assert updated["setup_score"]["gpp"] != first["setup_score"]["gpp"]
+    assert updated["safety"]
+
+
 def test_virtual_coach_bow_not_found(client: TestClient):
     _, arrow_id = _create_equipment(client)
     response = client.post(
@@ -98,6 +176,14 @@ def test_virtual_coach_bow_not_found(client: TestClient):
         },
     )
     assert response.status_code == 404
+    assert response.json()["detail"] == "Bow setup not found"
+
+
+def test_safety_check_arrow_not_found(client: TestClient):
+    bow_id, _ = _create_equipment(client)
+    response = client.post("/api/analysis/safety-check", json={"bow_id": bow_id, "arrow_id": "nonexistent"})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Arrow setup not found"
 
 
 def test_safety_check(client: TestClient):
@@ -113,6 +199,40 @@ def test_safety_check(client: TestClient):
     assert "warnings" in response.json()
 
 
+def test_safety_check_etag(client: TestClient):
+    bow_id, arrow_id = _create_equipment(client)
+    payload = {"bow_id": bow_id, "arrow_id": arrow_id}
+    first = client.post("/api/analysis/safety-check", json=payload)
+    etag = first.headers["etag"]
+
+    cached = client.post("/api/analysis/safety-check", json=payload, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    # Editing the arrow changes the ETag
+    client.put(f"/api/arrows/{arrow_id}", json={"total_arrow_weight_gr": 150})
+    changed = client.post("/api/analysis/safety-check", json=payload, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_setup_efficiency_etag_varies_by_discipline(client: TestClient):
+    bow_id, arrow_id = _create_equipment(client)
+    payload = {"bow_id": bow_id, "arrow_id": arrow_id, "discipline": "indoor"}
+    etag = client.post("/api/analysis/setup-efficiency", json=payload).headers["etag"]
+
+    cached = client.post("/api/analysis/setup-efficiency", json=payload, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    outdoor = client.post(
+        "/api/analysis/setup-efficiency",
+        json={**payload, "discipline": "outdoor"},
+        headers={"If-None-Match": etag},
+    )
+    assert outdoor.status_code == 200
+
+
 def test_setup_efficiency(client: TestClient):
     bow_id, arrow_id = _create_equipment(client)
     response = client.post(
@@ -755,6 +755,13 @@ def test_equipment_comparison_endpoint(client: TestClient):
     assert "sigma_significant" in data
     assert "interpretation" in data
 
+    # Round types take the same comma-separated form as the other analytics filters
+    response = client.get(
+        "/api/analytics/equipment-comparison",
+        params={"setup_a_bow_id": bow_a_id, "setup_b_bow_id": bow_b_id, "round_type": "WA 18m, WA 50m"},
+    )
+    assert response.json()["setup_a_sessions"] == 3
+
 
 def test_dashboard_stats(client: TestClient):
     """Test dashboard statistics endpoint."""
@@ -884,3 +891,246 @@ def test_dashboard_stats_empty_database(client: TestClient):
     assert data["personal_best_date"] is None
     assert data["sparkline_dates"] == []
     assert data["sparkline_scores"] == []
+
+
+def test_session_summaries(client: TestClient):
+    """Test per-session summary statistics and round filtering."""
+    import numpy as np
+
+    bow = client.post(
+        "/api/bows",
+        json={
+            "name": "Summary Bow",
+            "riser_make": "Gillo",
+            "riser_model": "G1",
+            "riser_length_in": 25,
+            "limbs_make": "Uukha",
+            "limbs_model": "SX50",
+            "limbs_length": "Long",
+            "limbs_marked_poundage": 38,
+            "draw_weight_otf": 36,
+            "brace_height_in": 8.75,
+            "tiller_top_mm": 0,
+            "tiller_bottom_mm": 0,
+            "tiller_type": "neutral",
+            "plunger_spring_tension": 5,
+            "plunger_center_shot_mm": 0,
+            "nocking_point_height_mm": 0,
+        },
+    ).json()
+    session_id = client.post(
+        "/api/sessions",
+        json={"round_type": "WA 18m", "target_face_size_cm": 40, "distance_m": 18, "bow_id": bow["id"]},
+    ).json()["id"]
+    shots = [
+        {"score": 10, "is_x": True, "x": 0.5, "y": 0.3},
+        {"score": 9, "is_x": False, "x": 1.2, "y": -0.8},
+        {"score": 8, "is_x": False, "x": 2.1, "y": 1.5},
+        {"score": 7, "is_x": False, "x": -3.0, "y": 0.4},
+    ]
+    client.post(f"/api/sessions/{session_id}/ends", json={"end_number": 1, "shots": shots})
+    client.post("/api/sessions", json={"round_type": "WA 50m", "target_face_size_cm": 122, "distance_m": 50})
+
+    data = client.get("/api/analytics/summary").json()
+    assert len(data) == 2
+    empty = next(s for s in data if s["round_type"] == "WA 50m")
+    assert empty["shot_count"] == 0
+    assert empty["cep_50"] == 0.0
+    assert empty["bow_name"] is None
+
+    summary = client.get("/api/analytics/summary", params={"round_type": "WA 18m"}).json()
+    assert len(summary) == 1
+    summary = summary[0]
+    xs = np.array([s["x"] for s in shots])
+    ys = np.array([s["y"] for s in shots])
+    radii = np.hypot(xs, ys)
+    assert summary["total_score"] == 34
+    assert summary["shot_count"] == 4
+    assert summary["avg_score"] == 8.5
+    assert summary["mean_radius"] == round(float(np.mean(radii)), 2)
+    assert summary["sigma_x"] == round(float(np.std(xs)), 2)
+    assert summary["sigma_y"] == round(float(np.std(ys)), 2)
+    assert summary["cep_50"] == round(float(np.percentile(radii, 50)), 2)
+    assert summary["bow_name"] == bow["name"]
+    assert summary["arrow_name"] is None
+
+
+def test_cached_analytics_invalidated_by_writes(client: TestClient):
+    """Cached analytics responses are reused until data changes."""
+    session_id = client.post(
+        "/api/sessions", json={"round_type": "WA 18m", "target_face_size_cm": 40, "distance_m": 18}
+    ).json()["id"]
+    shots = [{"score": 9, "is_x": False, "x": 1.0, "y": 1.0}, {"score": 8, "is_x": False, "x": -2.0, "y": 1.0}]
+    client.post(f"/api/sessions/{session_id}/ends", json={"end_number": 1, "shots": shots})
+
+    first = client.get("/api/analytics/summary").json()
+    assert first == client.get("/api/analytics/summary").json()
+    assert first[0]["total_score"] == 17
+
+    hit_params = {"round_type": "WA 18m"}
+    assert client.get("/api/analytics/hit-probability", params=hit_params).json()["total_shots"] == 2
+    assert len(client.get("/api/analytics/shots").json()) == 2
+    assert client.get("/api/analytics/within-end").json()["total_ends"] == 1
+
+    client.post(f"/api/sessions/{session_id}/ends", json={"end_number": 2, "shots": shots})
+    updated = client.get("/api/analytics/summary").json()
+    assert updated[0]["total_score"] == 34
+    assert updated[0]["shot_count"] == 4
+    assert client.get("/api/analytics/hit-probability", params=hit_params).json()["total_shots"] == 4
+    assert len(client.get("/api/analytics/shots").json()) == 4
+    assert client.get("/api/analytics/within-end").json()["total_ends"] == 2
+
+
+def test_analytics_etag_revalidation(client: TestClient, monkeypatch):
+    """Analytics GETs carry an ETag; a matching If-None-Match gets 304 until data changes."""
+    # Keep the tag's time window fixed for the duration of the test
+    monkeypatch.setattr("api.routers.analytics._cache.CACHE_TTL_SECONDS", 1e9)
+    session_id = client.post(
+        "/api/sessions", json={"round_type": "WA 18m", "target_face_size_cm": 40, "distance_m": 18}
+    ).json()["id"]
+    shots = [{"score": 9, "is_x": False, "x": 1.0, "y": 1.0}]
+    client.post(f"/api/sessions/{session_id}/ends", json={"end_number": 1, "shots": shots})
+
+    response = client.get("/api/analytics/summary")
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    revalidated = client.get("/api/analytics/summary", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.content == b""
+
+    # Tags are per URL, including the query
+    filtered = client.get("/api/analytics/summary", params={"round_type": "WA 18m"}, headers={"If-None-Match": etag})
+    assert filtered.status_code == 200
+    assert filtered.headers["etag"] != etag
+
+    client.post(f"/api/sessions/{session_id}/ends", json={"end_number": 2, "shots": shots})
+    changed = client.get("/api/analytics/summary", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()[0]["shot_count"] == 2
+
+
+def test_personal_bests(client: TestClient):
+    """Test personal bests pick the top session per round type."""
+    totals = [("WA 18m", [9, 8]), ("WA 18m", [10, 10]), ("WA 18m", [10, 10]), ("WA 50m", [7, 6]), ("WA 25m", [])]
+    session_ids = []
+    for round_type, scores in totals:
+        session_id = client.post(
+            "/api/sessions", json={"round_type": round_type, "target_face_size_cm": 40, "distance_m": 18}
+        ).json()["id"]
+        session_ids.append(session_id)
+        if scores:
+            shots = [{"score": s, "is_x": False, "x": 0.0, "y": 0.0} for s in scores]
+            client.post(f"/api/sessions/{session_id}/ends", json={"end_number": 1, "shots": shots})
+
+    data = client.get("/api/analytics/personal-bests").json()
+    assert [(pb["round_type"], pb["total_score"]) for pb in data] == [("WA 18m", 20), ("WA 50m", 13), ("WA 25m", 0)]
+    # Ties go to the earlier session
+    assert data[0]["session_id"] == session_ids[1]
+    assert data[0]["avg_score"] == 10.0
+    assert data[2]["avg_score"] == 0.0
+
+
+def test_stream_all_shots_ndjson(client: TestClient):
+    """Test NDJSON shot stream matches the /shots records."""
+    import json
+
+    session_id = client.post(
+        "/api/sessions", json={"round_type": "WA 18m", "target_face_size_cm": 40, "distance_m": 18}
+    ).json()["id"]
+    for end_number in (1, 2):
+        shots = [
+            {"score": 10 - end_number, "is_x": False, "x": 0.5 * end_number, "y": -0.5, "arrow_number": 1},
+            {"score": 8, "is_x": False, "x": -1.0, "y": 1.5},
+        ]
+        client.post(f"/api/sessions/{session_id}/ends", json={"end_number": end_number, "shots": shots})
+    client.post("/api/sessions", json={"round_type": "WA 50m", "target_face_size_cm": 122, "distance_m": 50})
+
+    response = client.get("/api/analytics/shots.ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    etag = response.headers["etag"]
+    assert client.get("/api/analytics/shots.ndjson", headers={"If-None-Match": etag}).status_code == 304
+    # Weak comparison: the bare opaque tag matches too
+    bare = etag.removeprefix("W/")
+    assert client.get("/api/analytics/shots.ndjson", headers={"If-None-Match": bare}).status_code == 304
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == 4
+    assert [r["end_number"] for r in records] == [1, 1, 2, 2]
+
+    def key(r):
+        return (r["end_number"], r["score"], r["x"])
+
+    assert sorted(records, key=key) == sorted(client.get("/api/analytics/shots").json(), key=key)
+
+    assert client.get("/api/analytics/shots.ndjson", params={"round_type": "WA 50m"}).text == ""
+    assert client.get("/api/analytics/shots.ndjson", params={"from_date": "bad"}).status_code == 422
+
+
+def test_date_filters_parse_repeatedly(client: TestClient):
+    """Filter dates are validated by FastAPI; invalid ones keep failing with 422."""
+    for _ in range(2):
+        assert client.get("/api/analytics/trends", params={"from_date": "2025-01-15"}).status_code == 200
+        assert client.get("/api/analytics/trends", params={"from_date": "2025-01-15T08:30:00"}).status_code == 200
+        response = client.get("/api/analytics/trends", params={"to_date": "not-a-date"})
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["query", "to_date"]
+
+
+def test_arrow_performance(client: TestClient):
+    """Per-arrow breakdown counts numbered and unnumbered shots and ranks arrows."""
+    session_id = client.post(
+        "/api/sessions", json={"round_type": "WA 18m", "target_face_size_cm": 40, "distance_m": 18}
+    ).json()["id"]
+    shots = [
+        {"score": 10, "is_x": True, "x": 0.2, "y": 0.1, "arrow_number": 1},
+        {"score": 7, "is_x": False, "x": 5.0, "y": -4.0, "arrow_number": 2},
+        {"score": 8, "is_x": False, "x": -2.0, "y": 3.0},
+    ]
+    for end_number in (1, 2):
+        client.post(f"/api/sessions/{session_id}/ends", json={"end_number": end_number, "shots": shots})
+    client.post("/api/sessions", json={"round_type": "WA 50m", "target_face_size_cm": 122, "distance_m": 50})
+
+    data = client.get("/api/analytics/arrow-performance", params={"group_size": 1}).json()
+    assert data["total_shots_with_number"] == 4
+    assert data["total_shots_without_number"] == 2
+    assert data["face_cm"] == 40
+    assert [a["arrow_number"] for a in data["arrows"]] == [1, 2]
+    assert [a["total_shots"] for a in data["arrows"]] == [2, 2]
+    assert data["arrows"][0]["x_count"] == 2
+    assert len(data["arrows"][1]["shots"]) == 2
+    assert (data["best_arrow"], data["worst_arrow"]) == (1, 2)
+    assert data["primary_set"] == [1]
+    assert [a["tier"] for a in data["arrows"]] == ["primary", "reserve"]
+
+    empty = client.get("/api/analytics/arrow-performance", params={"round_type": "WA 50m"}).json()
+    assert empty["arrows"] == []
+    assert empty["face_cm"] == 122
+    assert empty["total_shots_without_number"] == 0
+
+
+def test_analytics_overview(client: TestClient):
+    """The overview bundles the individual analyses for the same filters."""
+    for round_type, score in (("WA 18m", 9), ("WA 50m", 7)):
+        session_id = client.post(
+            "/api/sessions", json={"round_type": round_type, "target_face_size_cm": 40, "distance_m": 18}
+        ).json()["id"]
+        for end_number in (1, 2):
+            shots = [
+                {"score": score, "is_x": False, "x": 1.0 * end_number, "y": -0.5},
+                {"score": score - 1, "is_x": False, "x": -2.0, "y": 1.5 * end_number},
+            ]
+            client.post(f"/api/sessions/{session_id}/ends", json={"end_number": end_number, "shots": shots})
+
+    params = {"round_type": "WA 18m"}
+    data = client.get("/api/analytics/overview", params=params).json()
+    assert data["bias"]["total_shots"] == 4
+    for key, path in (
+        ("score_context", "score-context"),
+        ("bias", "bias-analysis"),
+        ("advanced_precision", "advanced-precision"),
+        ("within_end", "within-end"),
+        ("trends", "trends"),
+    ):
+        assert data[key] == client.get(f"/api/analytics/{path}", params=params).json()
@@ -0,0 +1,34 @@
+"""Tests for app-level routes."""
+
+from fastapi.testclient import TestClient
+
+
+def test_health(client: TestClient):
+    for path in ("/", "/api/health"):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert response.json() == {"status": "ok", "service": "BareTrack API"}
+
+
+def test_openapi_schema(client: TestClient):
+    response = client.get("/openapi.json")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    schema = response.json()
+    assert "/api/analysis/safety-check" in schema["paths"]
+    assert "/api/bows" in schema["paths"]
+    assert "/openapi.json" not in schema["paths"]
+
+    # Repeat hits serve the same pre-rendered document
+    assert client.get("/openapi.json").content == response.content
+    assert client.get("/docs").status_code == 200
+
+
+def test_large_responses_gzipped(client: TestClient):
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "/api/bows" in response.json()["paths"]
+
+    # Small bodies are sent uncompressed
+    response = client.get("/api/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
@@ -167,3 +167,61 @@ def test_list_sessions_with_stats(client: TestClient):
     assert data[0]["total_score"] == 54  # (10+9+8) * 2 ends
     assert data[0]["shot_count"] == 6
     assert data[0]["avg_score"] == 9.0
+
+
+def test_list_sessions_equipment_and_filters(client: TestClient):
+    """Listed sessions carry equipment names, include empty sessions and filter by bow."""
+    bow_data = {
+        "riser_make": "Hoyt",
+        "riser_model": "Satori",
+        "riser_length_in": 25,
+        "limbs_make": "SF",
+        "limbs_model": "Premium Plus",
+        "limbs_length": "Medium",
+        "limbs_marked_poundage": 36,
+        "draw_weight_otf": 32,
+        "brace_height_in": 8.5,
+        "tiller_top_mm": 3.0,
+        "tiller_bottom_mm": 3.5,
+        "tiller_type": "neutral",
+        "plunger_spring_tension": 12,
+        "plunger_center_shot_mm": 1.5,
+        "nocking_point_height_mm": 10.0,
+    }
+    bow_id = client.post("/api/bows", json=bow_data).json()["id"]
+    arrow_data = {
+        "make": "Easton",
+        "model": "Inspire",
+        "spine": 500,
+        "length_in": 30.5,
+        "point_weight_gr": 100,
+        "total_arrow_weight_gr": 350,
+        "shaft_diameter_mm": 6.5,
+        "fletching_type": "Vanes",
+        "nock_type": "Pin",
+    }
+    arrow_id = client.post("/api/arrows", json=arrow_data).json()["id"]
+
+    session_data = {"round_type": "WA 18m", "target_face_size_cm": 40, "distance_m": 18}
+    equipped_id = client.post("/api/sessions", json={**session_data, "bow_id": bow_id, "arrow_id": arrow_id}).json()[
+        "id"
+    ]
+    client.post(
+        f"/api/sessions/{equipped_id}/ends",
+        json={"end_number": 1, "shots": [{"score": 7, "is_x": False, "x": 3.0, "y": 2.0}]},
+    )
+    client.post("/api/sessions", json=session_data)
+
+    data = client.get("/api/sessions").json()
+    assert len(data) == 2
+    bare = next(s for s in data if s["id"] != equipped_id)
+    assert bare["shot_count"] == 0
+    assert bare["avg_score"] == 0.0
+    assert bare["bow_name"] is None
+    assert bare["arrow_name"] is None
+
+    data = client.get("/api/sessions", params={"bow_id": bow_id}).json()
+    assert len(data) == 1
+    assert data[0]["total_score"] == 7
+    assert data[0]["bow_name"] == "Hoyt Satori / SF Premium Plus"
+    assert data[0]["arrow_name"] == "Easton Inspire"
@@ -1,4 +1,8 @@
-from src.models import ArrowSetup, BowSetup, LimbAlignment
+from sqlalchemy import inspect, text
+from sqlmodel import Session, SQLModel, create_engine
+
+from src.db import _upgrade_shot_radius, get_data_version
+from src.models import ArrowSetup, BowSetup, LimbAlignment, Shot
 
 
 def test_bow_setup_creation():
@@ -47,3 +51,54 @@ def test_arrow_setup_creation():
     assert arrow.total_arrow_weight_gr == 450
     assert arrow.shaft_diameter_mm == 9.3
     assert arrow.arrow_count == 12
+
+
+def test_query_indexes_created():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    inspector = inspect(engine)
+
+    def index_columns(table):
+        return {index["name"]: index["column_names"] for index in inspector.get_indexes(table)}
+
+    assert index_columns("session")["ix_session_round_type_date"] == ["round_type", "date"]
+    assert index_columns("end")["ix_end_session_id_end_number"] == ["session_id", "end_number"]
+    assert index_columns("shot")["ix_shot_end_id"] == ["end_id"]
+
+
+def test_shot_radius_set_on_save():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as db:
+        shot = Shot(end_id="end-1", score=8, x=3.0, y=-4.0)
+        db.add(shot)
+        db.commit()
+        assert shot.radius_cm == 5.0
+
+        shot.x = 0.0
+        db.add(shot)
+        db.commit()
+        assert shot.radius_cm == 4.0
+
+
+def test_shot_radius_backfilled_on_old_database():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE shot (id VARCHAR PRIMARY KEY, end_id VARCHAR, score INTEGER, x FLOAT, y FLOAT)")
+        )
+        connection.execute(text("INSERT INTO shot VALUES ('a', 'end-1', 9, 6.0, 8.0)"))
+        _upgrade_shot_radius(connection)
+        assert connection.execute(text("SELECT radius_cm FROM shot")).scalar_one() == 10.0
+
+
+def test_data_version_bumped_by_commits_not_connections():
+    engine = create_engine("sqlite://")
+    version = get_data_version()
+    with engine.connect():
+        pass
+    assert get_data_version() == version
+
+    with Session(engine) as db:
+        db.commit()
+    assert get_data_version() > version
@@ -56,3 +56,26 @@ def test_drag_loss_scenario():
     pred_50, _ = predict_score_at_distance(score_18, 18, 40, 50, 122)
 
     assert pred_50 > score_50
+
+
+def test_predict_score_batch_matches_scalar():
+    from src.park_model import predict_score_batch
+
+    targets = [(18, 40), (30, 80), (50, 122), (70, 122)]
+    scores, sigmas = predict_score_batch(9.0, 18, 40, [d for d, _ in targets], [f for _, f in targets])
+
+    for (distance, face), score, sigma in zip(targets, scores, sigmas, strict=True):
+        expected_score, expected_sigma = predict_score_at_distance(9.0, 18, 40, distance, face)
+        assert abs(score - expected_score) < 1e-9
+        assert abs(sigma - expected_sigma) < 1e-9
+
+
+def test_predict_score_batch_edge_cases():
+    from src.park_model import predict_score_batch
+
+    # Perfect known score, zero known distance, and a zero score in one call
+    scores, sigmas = predict_score_batch([10.0, 8.0, 0.0], [18, 0, 18], 40, 30, 80)
+    for i, args in enumerate([(10.0, 18), (8.0, 0), (0.0, 18)]):
+        expected_score, expected_sigma = predict_score_at_distance(args[0], args[1], 40, 30, 80)
+        assert abs(scores[i] - expected_score) < 1e-9
+        assert abs(sigmas[i] - expected_sigma) < 1e-9
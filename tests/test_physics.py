@@ -1,4 +1,5 @@
-from src.physics import calculate_foc
+from src.models import ArrowSetup, BowSetup
+from src.physics import analyze_setup_safety, calculate_foc, score_setup_efficiency
 
 
 def test_calculate_foc_standard():
@@ -48,3 +49,62 @@ def test_calculate_foc_high():
 
 def test_calculate_foc_zero():
     assert calculate_foc(0, 0, 0) == 0.0
+
+
+def _setup(arrow_weight_gr, draw_weight_lbs, shaft_diameter_mm=7.0):
+    bow = BowSetup(
+        name="Test",
+        riser_make="R",
+        riser_model="R",
+        riser_length_in=25,
+        limbs_make="L",
+        limbs_model="L",
+        limbs_length="Long",
+        limbs_marked_poundage=draw_weight_lbs,
+        draw_weight_otf=draw_weight_lbs,
+        brace_height_in=8.5,
+        tiller_top_mm=0,
+        tiller_bottom_mm=0,
+        tiller_type="neutral",
+        plunger_spring_tension=5,
+        plunger_center_shot_mm=0,
+        nocking_point_height_mm=0,
+    )
+    arrow = ArrowSetup(
+        make="A",
+        model="A",
+        spine=500,
+        length_in=29,
+        point_weight_gr=100,
+        total_arrow_weight_gr=arrow_weight_gr,
+        shaft_diameter_mm=shaft_diameter_mm,
+        fletching_type="vanes",
+        nock_type="pin",
+    )
+    return bow, arrow
+
+
+def test_analyze_setup_safety_bands():
+    assert analyze_setup_safety(*_setup(180, 40))[0].startswith("CRITICAL")
+    assert analyze_setup_safety(*_setup(200, 40))[0].startswith("WARNING")
+    assert analyze_setup_safety(*_setup(280, 40)) == []
+
+
+def test_score_setup_efficiency_boundaries():
+    # Exactly on a strict ">" limit stays in the lower band
+    indoor = score_setup_efficiency(*_setup(520, 40, 9.3), discipline="indoor")
+    assert indoor["score"] == 100
+    assert indoor["feedback"] == ["Excellent GPP for Indoor stability."]
+
+    outdoor = score_setup_efficiency(*_setup(360, 40, 6.0), discipline="outdoor")
+    assert outdoor == {"score": 100, "gpp": 9.0, "feedback": []}
+
+    heavy = score_setup_efficiency(*_setup(400, 40, 6.5), discipline="outdoor")
+    assert heavy["score"] == 65
+    assert heavy["feedback"][0] == "GPP (10.0) is heavy for Outdoor. You may struggle with 50m sight marks."
+
+    light = score_setup_efficiency(*_setup(280, 40, 5.0), discipline="indoor")
+    assert light["score"] == 60
+    assert len(light["feedback"]) == 2
+
+    assert score_setup_efficiency(*_setup(280, 40), discipline="field")["feedback"] == []
@@ -1,15 +1,24 @@
 """Tests for src/precision.py"""
 
+import json
+
 import numpy as np
+from scipy import stats
 
 from src.precision import (
+    compass_direction,
     compute_accuracy_precision_ratio,
     compute_confidence_ellipse,
     compute_drms,
     compute_equipment_comparison,
     compute_ewma,
+    compute_ewma_series,
     compute_extreme_spread,
+    compute_group_stats,
+    compute_group_stats_by_group,
+    compute_grouped_consistency,
     compute_hit_probability,
+    compute_linear_trend,
     compute_multi_distance_profile,
     compute_practice_consistency,
     compute_r95,
@@ -37,7 +46,60 @@ class TestDRMS:
         assert result > 3.0  # should be large
 
 
+class TestGroupStats:
+    def test_matches_numpy(self):
+        result = compute_group_stats(WIDE_XS, WIDE_YS)
+        radii = np.hypot(WIDE_XS, WIDE_YS)
+        assert np.isclose(result["mpi_x"], np.mean(WIDE_XS))
+        assert np.isclose(result["sigma_x"], np.std(WIDE_XS))
+        assert np.isclose(result["sigma_y"], np.std(WIDE_YS))
+        assert np.isclose(result["mean_radius"], np.mean(radii))
+        assert np.isclose(result["cep_50"], np.percentile(radii, 50))
+
+    def test_by_group_matches_per_group(self):
+        rng = np.random.default_rng(7)
+        groups = rng.permutation(np.repeat(np.arange(4), [1, 2, 5, 8]))
+        xs, ys = rng.normal(1.0, 3.0, len(groups)), rng.normal(-0.5, 2.0, len(groups))
+        result = compute_group_stats_by_group(groups, xs, ys)
+        for g in range(4):
+            expected = compute_group_stats(xs[groups == g], ys[groups == g])
+            for key, value in expected.items():
+                assert np.isclose(result[key][g], value)
+
+        # Precomputed radii (e.g. the stored Shot.radius_cm) give the same result
+        stored = compute_group_stats_by_group(groups, xs, ys, np.hypot(xs, ys))
+        for key, values in result.items():
+            assert np.allclose(stored[key], values)
+
+    def test_empty(self):
+        result = compute_group_stats(np.array([]), np.array([]))
+        assert result["sigma_x"] == 0.0
+        assert result["cep_50"] == 0.0
+
+
+class TestCompassDirection:
+    def test_scalar(self):
+        assert compass_direction(1.0, 0.0) == "E"
+        assert compass_direction(-1.0, -1.0) == "SW"
+        assert compass_direction(0.1, -2.0) == "S"
+
+    def test_vectorised_matches_atan2(self):
+        angles = np.linspace(-np.pi, np.pi, 721)
+        dx, dy = np.cos(angles), np.sin(angles)
+        expected = [
+            ["E", "NE", "N", "NW", "W", "SW", "S", "SE"][round(a / (np.pi / 4)) % 8] for a in np.arctan2(dy, dx)
+        ]
+        assert compass_direction(dx, dy).tolist() == expected
+
+
 class TestR95:
+    def test_matches_numpy_percentile(self):
+        rng = np.random.default_rng(3)
+        for n in (1, 2, 5, 10, 101):
+            xs, ys = rng.normal(size=n), rng.normal(size=n)
+            radii = np.hypot(xs - xs.mean(), ys - ys.mean())
+            assert np.isclose(compute_r95(xs, ys), np.percentile(radii, 95))
+
     def test_r95_tight(self):
         result = compute_r95(TIGHT_XS, TIGHT_YS)
         assert result > 0
@@ -104,6 +166,15 @@ class TestConsistency:
         result = compute_practice_consistency([500])
         assert result["cv"] == 0.0
 
+    def test_grouped_matches_per_group(self):
+        groups = np.array(["WA 50m", "WA 18m", "WA 50m", "Indoor", "WA 18m", "WA 50m"])
+        scores = np.array([300, 500, 350, 540, 505, 480])
+        result = compute_grouped_consistency(groups, scores)
+        assert list(result) == ["WA 50m", "WA 18m", "Indoor"]
+        for rt, group_result in result.items():
+            expected = compute_practice_consistency(scores[groups == rt].tolist())
+            assert group_result == {**expected, "count": int(np.sum(groups == rt))}
+
 
 class TestEWMA:
     def test_ewma_length(self):
@@ -117,6 +188,16 @@ class TestEWMA:
         for upper, lower in zip(result["ucl"], result["lcl"], strict=True):
             assert upper > lower
 
+    def test_series_matches_recurrence(self):
+        values = [8.0, 7.5, 8.2, 7.8, 8.5]
+        expected = []
+        ewma = 9.0
+        for x in values:
+            ewma = 0.3 * x + 0.7 * ewma
+            expected.append(ewma)
+        assert np.allclose(compute_ewma_series(values, 0.3, initial=9.0), expected)
+        assert len(compute_ewma_series([], 0.3, initial=9.0)) == 0
+
 
 class TestWithinEndTrend:
     def test_declining_trend(self):
@@ -130,6 +211,19 @@ class TestWithinEndTrend:
         assert result["positions"] == []
 
 
+class TestLinearTrend:
+    def test_matches_polyfit_and_corrcoef(self):
+        xs = np.arange(1, 11)
+        ys = np.array([9.2, 9.0, 9.1, 8.7, 8.8, 8.5, 8.6, 8.2, 8.4, 8.0])
+        result = compute_linear_trend(xs, ys)
+        assert np.isclose(result["slope"], np.polyfit(xs, ys, 1)[0])
+        assert np.isclose(result["correlation"], np.corrcoef(xs, ys)[0, 1])
+
+    def test_flat_series(self):
+        result = compute_linear_trend(np.arange(5), np.full(5, 9.0))
+        assert result == {"slope": 0.0, "correlation": 0.0}
+
+
 class TestConfidenceEllipse:
     def test_ellipse_structure(self):
         result = compute_confidence_ellipse(TIGHT_XS, TIGHT_YS)
@@ -137,6 +231,22 @@ class TestConfidenceEllipse:
         assert result["semi_minor"] > 0
         assert result["semi_major"] >= result["semi_minor"]
 
+    def test_matches_eigendecomposition(self):
+        rng = np.random.default_rng(5)
+        xs = rng.normal(0, 3.0, 40)
+        ys = 0.6 * xs + rng.normal(0, 1.0, 40)
+        result = compute_confidence_ellipse(xs, ys, coverage=0.9)
+        eigenvalues, eigenvectors = np.linalg.eigh(np.cov(xs, ys))
+        scale = np.sqrt(eigenvalues * 2 * -np.log(0.1))
+        assert np.isclose(result["semi_major"], scale[1], atol=1e-3)
+        assert np.isclose(result["semi_minor"], scale[0], atol=1e-3)
+        angle = np.degrees(np.arctan2(eigenvectors[1, 1], eigenvectors[0, 1]))
+        assert np.isclose((result["angle_deg"] - angle) % 180, 0, atol=0.1) or np.isclose(
+            (result["angle_deg"] - angle) % 180, 180, atol=0.1
+        )
+        assert -90 < result["angle_deg"] <= 90
+        assert np.isclose(result["correlation"], np.corrcoef(xs, ys)[0, 1], atol=1e-3)
+
     def test_few_shots(self):
         result = compute_confidence_ellipse(np.array([1, 2]), np.array([1, 2]))
         assert result["semi_major"] == 0.0
@@ -198,6 +308,32 @@ class TestEquipmentComparison:
         result = compute_equipment_comparison(scores, [2.5] * 5, "Setup A", scores, [2.5] * 5, "Setup B")
         assert result["score_significant"] is False
 
+    def test_batched_tests_match_scipy(self):
+        a_scores, a_sigmas = [8.5, 8.1, 8.4, 8.9], [2.1, 2.4, 1.9, 2.2]
+        b_scores, b_sigmas = [8.0, 8.3, 7.7, 8.1, 7.9], [2.6, 2.3, 2.8, 2.5, 2.9]
+        result = compute_equipment_comparison(a_scores, a_sigmas, "A", b_scores, b_sigmas, "B")
+        assert result["score_p_value"] == round(stats.ttest_ind(a_scores, b_scores, equal_var=False).pvalue, 4)
+        assert result["sigma_p_value"] == round(stats.ttest_ind(a_sigmas, b_sigmas, equal_var=False).pvalue, 4)
+        assert result["sigma_diff"] == round(np.mean(a_sigmas) - np.mean(b_sigmas), 3)
+
+    def test_sigmas_of_different_length(self):
+        result = compute_equipment_comparison([9, 8, 7], [1.0, 2.0], "A", [8, 8, 9], [1.0, 2.0, 3.0], "B")
+        assert result["sigma_p_value"] == round(stats.ttest_ind([1.0, 2.0], [1.0, 2.0, 3.0], equal_var=False).pvalue, 4)
+        assert result["sigma_p_value"] == 0.5612
+        assert result["score_p_value"] == round(stats.ttest_ind([9, 8, 7], [8, 8, 9], equal_var=False).pvalue, 4)
+
+    def test_too_few_sigmas(self):
+        result = compute_equipment_comparison([9, 8, 7], [1.0], "A", [8, 8, 9], [1.0, 2.0, 3.0], "B")
+        assert result["sigma_p_value"] == 1.0
+        assert result["sigma_diff"] == -1.0
+        assert result["sigma_significant"] is False
+
+    def test_no_sigmas(self):
+        result = compute_equipment_comparison([9, 8, 7], [], "A", [8, 8, 9], [1.0, 2.0, 3.0], "B")
+        assert result["sigma_p_value"] == 1.0
+        assert result["sigma_diff"] == 0.0
+        json.dumps(result, allow_nan=False)
+
     def test_insufficient_data(self):
         result = compute_equipment_comparison([8.0], [2.0], "A", [7.0], [3.0], "B")
         assert "Need ≥2" in result["interpretation"]